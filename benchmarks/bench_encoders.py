@@ -0,0 +1,37 @@
+"""Compare encode time and payload size of the /alunos body per encoder.
+
+Usage: python benchmarks/bench_encoders.py [STUDENTS ...]
+"""
+import json
+import sys
+
+from common import scaled_alunos, timed
+
+from dataset import Dataset
+from encoders import encode_json, encode_msgpack, msgpack, orjson
+
+
+def stdlib_json(content):
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+
+
+ENCODERS = {'json (stdlib)': stdlib_json}
+if orjson is not None:
+    ENCODERS['json (orjson)'] = encode_json
+if msgpack is not None:
+    ENCODERS['msgpack'] = encode_msgpack
+
+
+def main(sizes):
+    for n in sizes:
+        dataset = Dataset(scaled_alunos(n))
+        content = dataset.store.rows(range(dataset.snapshot.size))
+        print(f'{n} students')
+        for name, encoder in ENCODERS.items():
+            size = len(encoder(content))
+            seconds = timed(lambda: encoder(content))
+            print(f'  {name:<14} {seconds * 1000:9.2f} ms  {size / 1024:10.1f} KiB')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1_000, 10_000, 100_000])
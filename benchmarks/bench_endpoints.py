@@ -0,0 +1,277 @@
+"""Latency, throughput and peak memory of the API endpoints, written as JSON.
+
+Every scenario runs against the ASGI app in-process and through
+lambda_handler with synthetic API Gateway (REST API) proxy events.
+
+Usage:
+    python benchmarks/bench_endpoints.py [--students N ...] [--rows N ...]
+        [--requests N] [--concurrency N] [--drivers asgi lambda]
+        [--output results.json] [--compare baseline.json]
+"""
+import argparse
+import asyncio
+import base64
+import datetime
+import json
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+# The upload scenarios go up to 100k-row sheets, well past the default limit.
+os.environ.setdefault('UPLOAD_MAX_BYTES', str(512 * 1024 * 1024))
+
+from common import ROOT, asgi_request, multipart_body, xlsx_bytes  # noqa: E402
+
+import generate_alunos  # noqa: E402
+
+import main  # noqa: E402
+
+
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# Shared by both drivers: Mangum runs each invocation on the current event loop.
+LOOP = asyncio.new_event_loop()
+asyncio.set_event_loop(LOOP)
+
+
+class Request(SimpleNamespace):
+    """One HTTP request of a scenario: method, path (with query), body and headers."""
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))]
+
+
+def api_gateway_event(request):
+    path, _, query = request.path.partition('?')
+    params = {}
+    for pair in filter(None, query.split('&')):
+        name, _, value = pair.partition('=')
+        params.setdefault(name, []).append(value)
+    return {
+        'resource': '/{proxy+}',
+        'path': path,
+        'httpMethod': request.method,
+        'headers': dict(request.headers),
+        'multiValueHeaders': {name: [value] for name, value in request.headers},
+        'queryStringParameters': {name: values[-1] for name, values in params.items()} or None,
+        'multiValueQueryStringParameters': params or None,
+        'pathParameters': {'proxy': path.lstrip('/')},
+        'stageVariables': None,
+        'requestContext': {
+            'resourcePath': '/{proxy+}',
+            'httpMethod': request.method,
+            'path': '/prod' + path,
+            'stage': 'prod',
+            'requestId': 'benchmark',
+            'identity': {'sourceIp': '127.0.0.1', 'userAgent': 'benchmark'},
+        },
+        'body': base64.b64encode(request.body).decode() if request.body else None,
+        'isBase64Encoded': bool(request.body),
+    }
+
+
+LAMBDA_CONTEXT = SimpleNamespace(
+    function_name='poli-fastapi-benchmark',
+    memory_limit_in_mb=1024,
+    aws_request_id='benchmark',
+    get_remaining_time_in_millis=lambda: 30_000,
+)
+
+
+def call_lambda(request):
+    response = main.lambda_handler(api_gateway_event(request), LAMBDA_CONTEXT)
+    return response['statusCode']
+
+
+async def call_asgi(request):
+    status, _, _ = await asgi_request(main.app, request.method, request.path, request.body, request.headers)
+    return status
+
+
+def run_asgi(requests, concurrency):
+    latencies = []
+    statuses = set()
+
+    async def worker(share):
+        for request in share:
+            start = time.perf_counter()
+            statuses.add(await call_asgi(request))
+            latencies.append(time.perf_counter() - start)
+
+    async def run():
+        await asyncio.gather(*(worker(requests[i::concurrency]) for i in range(concurrency)))
+
+    start = time.perf_counter()
+    LOOP.run_until_complete(run())
+    return latencies, time.perf_counter() - start, statuses
+
+
+def run_lambda(requests, concurrency):
+    # Each invocation of a Lambda instance handles one event at a time.
+    latencies = []
+    statuses = set()
+    start = time.perf_counter()
+    for request in requests:
+        began = time.perf_counter()
+        statuses.add(call_lambda(request))
+        latencies.append(time.perf_counter() - began)
+    return latencies, time.perf_counter() - start, statuses
+
+
+DRIVERS = {'asgi': run_asgi, 'lambda': run_lambda}
+
+
+def peak_memory(driver, request):
+    # Traced separately: tracemalloc slows allocation-heavy code down too much to time it.
+    tracemalloc.start()
+    try:
+        if driver == 'asgi':
+            LOOP.run_until_complete(call_asgi(request))
+        else:
+            call_lambda(request)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def read_scenarios(students, count, rng):
+    ids = [rng.randrange(students) for _ in range(count)]
+    return {
+        '/alunos': [Request(method='GET', path='/alunos', body=b'', headers=())],
+        '/alunos?limit=50': [Request(method='GET', path='/alunos?limit=50', body=b'', headers=())],
+        '/alunos/{id}': [Request(method='GET', path=f'/alunos/{i}', body=b'', headers=()) for i in ids],
+        '/filter_options': [Request(method='GET', path='/filter_options', body=b'', headers=())],
+        '/skill': [Request(method='GET', path='/skill', body=b'', headers=())],
+    }
+
+
+def upload_scenarios(sheet):
+    body, content_type = multipart_body('file', 'alunos.xlsx', sheet, XLSX)
+    headers = (('content-type', content_type),)
+    return {
+        f'/upload_spreadsheet?mode={mode}': [
+            Request(method='POST', path=f'/upload_spreadsheet?mode={mode}', body=body, headers=headers)
+        ]
+        for mode in ('json', 'stream')
+    }
+
+
+def measure(driver, endpoint, requests, count, concurrency, **labels):
+    # Scenarios with one distinct request repeat it `count` times.
+    plan = (requests * (count // len(requests) + 1))[:count]
+    DRIVERS[driver](plan[:1], 1)  # warm-up: caches, lazy imports, worker pools
+    latencies, elapsed, statuses = DRIVERS[driver](plan, concurrency)
+    result = {
+        'driver': driver,
+        'endpoint': endpoint,
+        **labels,
+        'requests': len(latencies),
+        'concurrency': concurrency if driver == 'asgi' else 1,
+        'statuses': sorted(statuses),
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'mean_ms': sum(latencies) / len(latencies) * 1000,
+        'throughput_rps': len(latencies) / elapsed,
+        'peak_bytes': peak_memory(driver, plan[0]),
+    }
+    print(
+        f"{driver:<6} {endpoint:<32} {json.dumps(labels):<26} "
+        f"p50 {result['p50_ms']:9.2f} ms  p99 {result['p99_ms']:9.2f} ms  "
+        f"{result['throughput_rps']:9.1f} req/s  peak {result['peak_bytes'] / 2 ** 20:8.1f} MiB",
+        flush=True,
+    )
+    return result
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline, results):
+    def key(result):
+        return result['driver'], result['endpoint'], result.get('students'), result.get('rows')
+
+    before = {key(result): result for result in baseline['results']}
+    print('\nChange against the baseline (new / old):')
+    for result in results['results']:
+        old = before.get(key(result))
+        if old is None:
+            continue
+        print(
+            f"{result['driver']:<6} {result['endpoint']:<32} "
+            f"{json.dumps({k: v for k, v in zip(('students', 'rows'), key(result)[2:]) if v is not None}):<26} "
+            f"p50 x{result['p50_ms'] / old['p50_ms']:5.2f}  p99 x{result['p99_ms'] / old['p99_ms']:5.2f}  "
+            f"peak x{result['peak_bytes'] / max(old['peak_bytes'], 1):5.2f}"
+        )
+
+
+def main_(args):
+    rng = random.Random(args.seed)
+    results = []
+    original = main.DATASET
+
+    for students in args.students:
+        main.DATASET = generate_alunos.generate_dataset(students, args.seed)
+        for endpoint, requests in read_scenarios(students, args.requests, rng).items():
+            for driver in args.drivers:
+                results.append(measure(driver, endpoint, requests, args.requests, args.concurrency, students=students))
+    main.DATASET = original
+
+    for rows in args.rows:
+        sheet = xlsx_bytes(generate_alunos.spreadsheet_rows(generate_alunos.generate_alunos(rows, args.seed), args.seed))
+        # Parsing a sheet takes far longer than a read, so uploads run a handful of times.
+        count = max(1, min(args.requests, args.upload_requests))
+        for endpoint, requests in upload_scenarios(sheet).items():
+            for driver in args.drivers:
+                results.append(measure(
+                    driver, endpoint, requests, count, args.concurrency, rows=rows, sheet_bytes=len(sheet)
+                ))
+
+    output = {
+        'meta': {
+            'timestamp': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+            'commit': git_commit(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'args': vars(args),
+            'max_rss_kib': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        },
+        'results': results,
+    }
+    with open(args.output, 'w') as f:
+        json.dump(output, f, indent=2)
+    print(f'\nResults written to {args.output}')
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--students', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--rows', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--requests', type=int, default=200, help='requests per read scenario')
+    parser.add_argument('--upload-requests', type=int, default=3, help='requests per upload scenario')
+    parser.add_argument(
+        '--concurrency', type=int, default=1,
+        help='concurrent in-process ASGI clients; above 1, latencies include time queued behind the others',
+    )
+    parser.add_argument('--drivers', nargs='+', choices=sorted(DRIVERS), default=sorted(DRIVERS))
+    parser.add_argument('--seed', type=int, default=0, help='seed of the generated students and sheets')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help='earlier results file to compare against')
+    main_(parser.parse_args())
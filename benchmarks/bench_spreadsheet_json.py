@@ -0,0 +1,38 @@
+"""Compare the DataFrame -> response body conversion of /upload_spreadsheet.
+
+before: df.to_json -> json.loads -> FastAPI's jsonable_encoder + json.dumps
+after:  df.to_json written straight into the response
+
+Usage: python benchmarks/bench_spreadsheet_json.py [ROWS ...]
+"""
+import datetime
+import json
+import sys
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+
+from common import scaled_alunos, spreadsheet_rows, timed
+
+
+def before(df):
+    data = json.loads(df.to_json(orient='records'))
+    return json.dumps(jsonable_encoder(data), ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def after(df):
+    return df.to_json(orient='records').encode()
+
+
+def main(sizes):
+    for n in sizes:
+        df = pd.DataFrame(spreadsheet_rows(scaled_alunos(n)))
+        df['Data de nascimento (DD/MM/AA)'] = datetime.datetime(2000, 1, 1)
+
+        assert json.loads(before(df)) == json.loads(after(df))
+        old, new = timed(lambda: before(df)), timed(lambda: after(df))
+        print(f'{n:>7} rows  before {old * 1000:8.1f} ms  after {new * 1000:8.1f} ms  speedup {old / new:4.1f}x')
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [10_000, 100_000])
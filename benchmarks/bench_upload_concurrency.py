@@ -0,0 +1,63 @@
+"""Check that read endpoints stay responsive while a large sheet is parsing.
+
+Uploads a generated sheet and keeps calling GET /alunos?limit=50 until the
+upload finishes. A read issued while the event loop is blocked waits for the
+whole block, so the longest gap between two completed reads is the worst
+latency a client could have seen. Exits with status 1 if that gap is longer
+than --max-latency-ms.
+
+Usage: python benchmarks/bench_upload_concurrency.py [--rows N] [--max-latency-ms MS]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from common import asgi_request, multipart_body, scaled_alunos, spreadsheet_rows, xlsx_bytes
+
+from main import app
+
+XLSX = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+
+async def run(rows):
+    body, content_type = multipart_body('file', 'alunos.xlsx', xlsx_bytes(spreadsheet_rows(scaled_alunos(rows))), XLSX)
+    upload = asyncio.create_task(
+        asgi_request(app, 'POST', '/upload_spreadsheet', body, [('content-type', content_type)])
+    )
+
+    gaps = []
+    start = last = time.perf_counter()
+    while not upload.done():
+        status, _, _ = await asgi_request(app, 'GET', '/alunos?limit=50')
+        assert status == 200
+        now = time.perf_counter()
+        gaps.append(now - last)
+        last = now
+        await asyncio.sleep(0)
+
+    status, _, _ = await upload
+    assert status == 200, status
+    gaps.append(time.perf_counter() - last)
+    return gaps, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--max-latency-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    gaps, elapsed = asyncio.run(run(args.rows))
+
+    worst = max(gaps) * 1000
+    print(f'upload of {args.rows} rows took {elapsed:.2f} s')
+    print(f'{len(gaps) - 1} reads during upload: p50 gap {statistics.median(gaps) * 1000:.1f} ms, max gap {worst:.1f} ms')
+    if worst > args.max_latency_ms:
+        print(f'FAIL: reads stalled for more than {args.max_latency_ms} ms')
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""Fail if importing the Lambda module regresses.
+
+Runs `python -X importtime -c "import main"` in fresh interpreters and checks:
+- none of the spreadsheet-only packages (pandas, openpyxl, numpy) is imported;
+- the best cumulative import time of `main` stays under the budget.
+
+Usage: python benchmarks/check_import_time.py [--budget-ms MS] [--runs N]
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from common import ROOT
+
+LAZY_PACKAGES = ('pandas', 'openpyxl', 'numpy')
+
+
+def import_times():
+    env = {**os.environ, 'PYTHONPATH': os.pathsep.join([os.path.join(ROOT, 'src'), ROOT])}
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import main'],
+        cwd=os.path.join(ROOT, 'src'), env=env, capture_output=True, text=True, check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line.split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget-ms', type=float, default=800)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.runs)]
+    failures = []
+
+    eager = sorted({name for times in runs for name in times if name.split('.')[0] in LAZY_PACKAGES})
+    if eager:
+        failures.append(f'imported at module load: {", ".join(eager[:10])}')
+
+    best = min(times['main'] for times in runs) / 1000
+    print(f'import main: best of {args.runs} runs {best:.0f} ms (budget {args.budget_ms:.0f} ms)')
+    if best > args.budget_ms:
+        failures.append(f'import main took {best:.0f} ms')
+
+    for failure in failures:
+        print(f'FAIL: {failure}')
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
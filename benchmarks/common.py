@@ -0,0 +1,119 @@
+import asyncio
+import io
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(ROOT, 'src'), ROOT]
+
+from fake_alunos import FAKE_ALUNOS  # noqa: E402
+from spreadsheet import ALL_COLUMNS  # noqa: E402
+
+
+def scaled_alunos(n):
+    alunos = []
+    for i in range(n):
+        aluno = dict(FAKE_ALUNOS[i % len(FAKE_ALUNOS)])
+        aluno['cpf'] = f'{i:011d}'
+        aluno['email'] = f'{i}.{aluno["email"]}'
+        alunos.append(aluno)
+    return alunos
+
+
+def spreadsheet_rows(alunos):
+    for aluno in alunos:
+        row = dict.fromkeys(ALL_COLUMNS)
+        row.update({
+            'Nome': aluno['nome'],
+            'Email de contato': aluno['email'],
+            'Universidade': aluno['universidade'],
+            'Curso': aluno['curso'],
+            'Ano de graduação': aluno['ano_graduacao'],
+            'Telefone': aluno['telefone'],
+            'Cidade': aluno['cidade'],
+            'Estado': aluno['estado'],
+            'País': aluno['pais'],
+            'CPF (só números)': aluno['cpf'],
+            'Modalidades de estágio buscadas': aluno['modalidade_estagio'],
+            'Competências': ', '.join(aluno['competencias']),
+            'Já estagiou?/ Está estagiando?': 'Sim' if aluno['ja_estagiou'] else 'Não',
+            'Você autoriza o compartilhamento dos seus dados para os bancos de talentos das empresas presentes no WI34?': 'Sim' if aluno['autoriza_dados'] else 'Não',
+        })
+        yield row
+
+
+def timed(fn, repeat=5):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+async def asgi_request(app, method, path, body=b'', headers=()):
+    path, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(name.lower().encode(), value.encode()) for name, value in headers],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    request_sent = False
+    response_done = asyncio.Event()
+    response = {'status': None, 'headers': [], 'body': bytearray()}
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await response_done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = message.get('headers', [])
+        elif message['type'] == 'http.response.body':
+            response['body'] += message.get('body', b'')
+            if not message.get('more_body', False):
+                response_done.set()
+
+    await app(scope, receive, send)
+    return response['status'], response['headers'], bytes(response['body'])
+
+
+def multipart_body(field, filename, content, content_type):
+    boundary = 'benchmarkboundary'
+    body = b''.join([
+        f'--{boundary}\r\n'.encode(),
+        f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'.encode(),
+        f'Content-Type: {content_type}\r\n\r\n'.encode(),
+        content,
+        f'\r\n--{boundary}--\r\n'.encode(),
+    ])
+    return body, f'multipart/form-data; boundary={boundary}'
+
+
+def xlsx_bytes(rows):
+    import openpyxl
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(ALL_COLUMNS)
+    for row in rows:
+        sheet.append([row[col] for col in ALL_COLUMNS])
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
@@ -0,0 +1,351 @@
+"""Deterministic synthetic students at any scale.
+
+The same seed always gives the same students, in the same order, whatever
+the output. Students are produced one at a time, so the spreadsheet and
+snapshot outputs run in bounded memory for millions of rows:
+
+    python generate_alunos.py 100000 --xlsx alunos.xlsx
+    python generate_alunos.py 1000000 --snapshot src/alunos.snapshot --seed 7
+"""
+import argparse
+import os
+import random
+import sys
+import unicodedata
+from itertools import accumulate, islice
+
+SRC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src')
+if SRC not in sys.path:
+    sys.path.append(SRC)
+
+
+# (name, city, state, email domain or None, weight)
+UNIVERSIDADES = [
+    ('USP Butantã', 'São Paulo', 'SP', 'usp.br', 30),
+    ('UNICAMP - Universidade Estadual de Campinas', 'Campinas', 'SP', 'dac.unicamp.br', 8),
+    ('UNIFEI - Universidade Federal de Itajubá', 'Itajubá', 'MG', 'unifei.edu.br', 5),
+    ('EEL USP - Escola de Engenharia de Lorena', 'Lorena', 'SP', 'usp.br', 4),
+    ('Inteli - Instituto de Tecnologia e Liderança', 'São Paulo', 'SP', 'sou.inteli.edu.br', 4),
+    ('Mackenzie', 'São Paulo', 'SP', 'mackenzista.com.br', 5),
+    ('FEI - Centro Universitário FEI', 'São Bernardo do Campo', 'SP', 'fei.edu.br', 4),
+    ('UFABC - Universidade Federal do ABC', 'Santo André', 'SP', 'aluno.ufabc.edu.br', 4),
+    ('ITA - Instituto Tecnológico de Aeronáutica', 'São José dos Campos', 'SP', 'ga.ita.br', 2),
+    ('FEG/Unesp - Faculdade de Engenharia - Câmpus de Guaratinguetá', 'Guaratinguetá', 'SP', 'unesp.br', 2),
+    ('CUFSA - Centro Universitário Fundação Santo André', 'Santo André', 'SP', None, 2),
+    ('FMU - Centro Universitário das Faculdades Metropolitanas Unidas', 'São Paulo', 'SP', None, 3),
+    ('UNIANHANGUERA - Anhanguera Educacional', 'São Paulo', 'SP', None, 2),
+    ('UFTM - Universidade Federal do Triângulo Mineiro', 'Uberaba', 'MG', 'uftm.edu.br', 1),
+    ('UFMG - Universidade Federal de Minas Gerais', 'Belo Horizonte', 'MG', 'ufmg.br', 4),
+    ('UFPR - Universidade Federal do Paraná', 'Curitiba', 'PR', 'ufpr.br', 3),
+    ('UFRJ - Universidade Federal do Rio de Janeiro', 'Rio de Janeiro', 'RJ', 'poli.ufrj.br', 4),
+    ('UFSC - Universidade Federal de Santa Catarina', 'Florianópolis', 'SC', 'grad.ufsc.br', 2),
+]
+
+# Where students who do not live in their university's city come from.
+CIDADES = {
+    'SP': ['São Paulo', 'Guarulhos', 'Osasco', 'São Bernardo do Campo', 'Santo André', 'Campinas', 'Santos', 'Sorocaba', 'Ribeirão Preto', 'São José dos Campos', 'Jundiaí', 'Limeira'],
+    'MG': ['Belo Horizonte', 'Uberlândia', 'Juiz de Fora', 'Itajubá', 'Pouso Alegre', 'Uberaba'],
+    'PR': ['Curitiba', 'Londrina', 'Maringá', 'Ponta Grossa'],
+    'RJ': ['Rio de Janeiro', 'Niterói', 'Petrópolis', 'Duque de Caxias'],
+    'SC': ['Florianópolis', 'Joinville', 'Blumenau', 'São José'],
+}
+
+DDDS = {
+    'SP': [11, 11, 11, 12, 13, 14, 15, 16, 17, 18, 19],
+    'MG': [31, 32, 34, 35, 37, 38],
+    'PR': [41, 42, 43, 44],
+    'RJ': [21, 22, 24],
+    'SC': [47, 48, 49],
+}
+
+CURSOS = [
+    ('Engenharia de Produção', 10), ('Engenharia Civil', 8), ('Engenharia de Computação', 8),
+    ('Engenharia Mecânica', 7), ('Engenharia Elétrica', 6), ('Ciência da Computação', 7),
+    ('Engenharia Química', 4), ('Engenharia Mecatrônica', 4), ('Engenharia de Controle e Automação', 3),
+    ('Engenharia Ambiental', 2), ('Engenharia de Materiais', 2), ('Engenharia Naval', 1),
+    ('Engenharia Aeroespacial', 1), ('Sistemas de Informação', 4), ('Análise e Desenvolvimento de Sistemas', 3),
+    ('Administração', 5), ('Economia', 4), ('Estatística', 2), ('Física', 1), ('Química', 1),
+    ('Arquitetura e Urbanismo', 2), ('Psicologia', 2), ('Relações Internacionais', 2),
+    ('Comunicação Social - Publicidade e Propaganda', 1), ('Bacharelado em Ciências e Tecnologia', 2),
+]
+
+# (first name, gender, weight)
+PRENOMES = [
+    ('Maria', 'F', 9), ('Ana', 'F', 8), ('Júlia', 'F', 6), ('Beatriz', 'F', 6), ('Letícia', 'F', 4),
+    ('Luíza', 'F', 4), ('Vitória', 'F', 3), ('Larissa', 'F', 3), ('Gabriela', 'F', 4), ('Camila', 'F', 3),
+    ('Mônica', 'F', 1), ('Lúcia', 'F', 1), ('Ângela', 'F', 1), ('Inês', 'F', 1), ('Giovanna', 'F', 3),
+    ('Isabela', 'F', 3), ('Mariana', 'F', 4), ('Fernanda', 'F', 3), ('Patrícia', 'F', 1), ('Débora', 'F', 1),
+    ('João', 'M', 9), ('Pedro', 'M', 7), ('Gabriel', 'M', 7), ('Lucas', 'M', 7), ('Rafael', 'M', 5),
+    ('Matheus', 'M', 5), ('Guilherme', 'M', 5), ('Felipe', 'M', 4), ('Vinícius', 'M', 3), ('Caio', 'M', 3),
+    ('Antônio', 'M', 2), ('José', 'M', 3), ('Moisés', 'M', 1), ('Cauã', 'M', 1), ('Tomás', 'M', 1),
+    ('Sérgio', 'M', 1), ('Otávio', 'M', 2), ('Enzo', 'M', 3), ('Thiago', 'M', 3), ('André', 'M', 2),
+]
+
+SEGUNDOS_NOMES = {
+    'F': ['Clara', 'Eduarda', 'Luiza', 'Vitória', 'Cecília', 'Helena', 'Fernanda'],
+    'M': ['Henrique', 'Augusto', 'Eduardo', 'Antônio', 'Vinícius', 'Luís', 'José'],
+}
+
+SOBRENOMES = [
+    ('Silva', 20), ('Santos', 15), ('Oliveira', 12), ('Souza', 10), ('Lima', 8), ('Pereira', 8),
+    ('Ferreira', 7), ('Costa', 7), ('Rodrigues', 7), ('Almeida', 6), ('Nascimento', 5), ('Araújo', 5),
+    ('Ribeiro', 5), ('Carvalho', 5), ('Gomes', 5), ('Martins', 5), ('Gonçalves', 4), ('Barros', 3),
+    ('Conceição', 3), ('Simões', 2), ('Brandão', 2), ('Magalhães', 2), ('Assunção', 1), ('Patrício', 1),
+    ('Monteiro', 3), ('Cardoso', 3), ('Teixeira', 3), ('Rocha', 3), ('Mendes', 3), ('Nogueira', 2),
+    ('Sampaio', 2), ('Macedo', 2), ('Falcão', 1), ('Peçanha', 1), ('Guimarães', 2), ('Antunes', 1),
+    ('Nakamura', 1), ('Tanaka', 1), ('Kato', 1), ('Moretti', 1), ('Schmidt', 1), ('Haddad', 1),
+]
+
+# Canonical skill -> chance that a student lists it.
+COMPETENCIAS = {
+    'Excel': 0.6, 'PowerPoint': 0.55, 'Python': 0.35, 'Problem Solving': 0.25, 'SQL': 0.15,
+    'Java': 0.12, 'CSS': 0.1, 'Certificações': 0.1, 'Gestão de Projetos': 0.08, 'Data Science': 0.07,
+    'Machine Learning': 0.06, 'Inteligência Artificial': 0.05, 'Business Analytics': 0.05,
+    'Modelagem Financeira': 0.05, 'Supply Chain': 0.04, 'Logística': 0.04, 'Engenharia de Dados': 0.04,
+    'Gestão de Negócios': 0.03, 'Gestão de Operações': 0.03, 'Design de Produto': 0.03,
+    'Adobe Creative Suite': 0.03, 'Programação Embarcada': 0.03, 'Assembly': 0.02, 'SAP': 0.02,
+    'TOTVS': 0.02, 'Trading': 0.02,
+}
+
+# Free-text skills of the "outras competências" column; the last ones are not in the skill table.
+OUTRAS_COMPETENCIAS = ['Figma', 'Power BI', 'JavaScript', 'HTML', 'C++', 'MATLAB', 'R', 'Canva', 'Kotlin', 'Rust']
+
+# How some students spell a skill in the sheet; skills.SKILL_TABLE maps each back.
+GRAFIAS = {
+    'Excel': ['excel', 'Excel Avançado'],
+    'PowerPoint': ['Power Point', 'PPT'],
+    'Python': ['python', 'Python 3'],
+    'Inteligência Artificial': ['IA'],
+    'Machine Learning': ['ML'],
+    'Assembly': ['assembly'],
+}
+
+MODALIDADES = [('Estágio de Férias', 0.55), ('Meio Período', 0.45), ('Integral', 0.35), ('Short Job', 0.15), ('Outros', 0.05)]
+
+ANOS_GRADUACAO = [(2024, 3), (2025, 8), (2026, 12), (2027, 10), (2028, 8), (2029, 6), (2030, 3)]
+
+EMAIL_DOMAINS = [('gmail.com', 70), ('hotmail.com', 15), ('outlook.com', 10), ('yahoo.com.br', 5)]
+
+NIVEIS = ['Básico', 'Intermediário', 'Avançado', 'Fluente']
+AREAS = ['Tecnologia', 'Mercado Financeiro', 'Consultoria', 'Indústria', 'Varejo', 'Energia', 'Saúde', 'Logística']
+EMPRESAS = ['Itaú', 'Google', 'Ambev', 'Nubank', 'Vale', 'Petrobras', 'BTG Pactual', 'Mercado Livre', 'McKinsey', 'Natura']
+ORGANIZACOES = ['Poli Júnior', 'Enactus', 'AIESEC', 'Equipe de Fórmula SAE', 'Liga de Mercado Financeiro', 'Centro Acadêmico']
+ETNIAS = [('Branca', 45), ('Parda', 33), ('Preta', 12), ('Amarela', 6), ('Indígena', 1), ('Prefiro não responder', 3)]
+GENEROS = {'F': 'Feminino', 'M': 'Masculino'}
+
+
+class Weighted:
+    """A population with precomputed cumulative weights, for fast repeated draws."""
+
+    def __init__(self, items):
+        *values, weights = zip(*items)
+        self.values = list(zip(*values)) if len(values) > 1 else list(values[0])
+        self.cum_weights = list(accumulate(weights))
+
+    def draw(self, rng):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+
+_universidades = Weighted(UNIVERSIDADES)
+_cursos = Weighted(CURSOS)
+_prenomes = Weighted(PRENOMES)
+_sobrenomes = Weighted(SOBRENOMES)
+_anos = Weighted(ANOS_GRADUACAO)
+_domains = Weighted(EMAIL_DOMAINS)
+_etnias = Weighted(ETNIAS)
+_dominios_universidade = {name: domain for name, _, _, domain, _ in UNIVERSIDADES}
+_generos = {name: genero for name, genero, _ in PRENOMES}
+
+
+def ascii_slug(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if char.isascii() and char.isalnum()).lower()
+
+
+def cpf_with_check_digits(base):
+    digits = [int(char) for char in base]
+    for _ in range(2):
+        total = sum(digit * weight for digit, weight in zip(digits, range(len(digits) + 1, 1, -1)))
+        digits.append(total * 10 % 11 % 10)
+    return ''.join(map(str, digits))
+
+
+def generate_alunos(n, seed=0):
+    """Yields `n` students with the FAKE_ALUNOS fields, in Aluno field order.
+
+    CPFs are valid and, like emails, unique within a run: the CPF base is a
+    bijection of the student's index, and the index is part of the email.
+    """
+    rng = random.Random(seed)
+    # Multiplying by a number coprime to 10**9 permutes the 9-digit CPF bases.
+    cpf_offset = rng.randrange(10 ** 9)
+
+    for index in range(n):
+        prenome, genero = _prenomes.draw(rng)
+        nomes = [prenome]
+        if rng.random() < 0.3:
+            nomes.append(rng.choice(SEGUNDOS_NOMES[genero]))
+        sobrenomes = []
+        for _ in range(rng.choice((1, 2, 2, 3))):
+            sobrenome = _sobrenomes.draw(rng)
+            if sobrenome not in sobrenomes:
+                sobrenomes.append(sobrenome)
+        if len(sobrenomes) > 1 and rng.random() < 0.2:
+            sobrenomes.insert(-1, rng.choice(['de', 'da', 'dos']))
+        nome = ' '.join(nomes + sobrenomes)
+
+        universidade, cidade_universidade, estado, dominio_universidade = _universidades.draw(rng)
+        cidade = cidade_universidade if rng.random() < 0.7 else rng.choice(CIDADES[estado])
+        local = f'{ascii_slug(prenome)}.{ascii_slug(sobrenomes[-1])}{index}'
+        if dominio_universidade is not None and rng.random() < 0.4:
+            email = f'{local}@{dominio_universidade}'
+        else:
+            email = f'{local}@{_domains.draw(rng)}'
+
+        competencias = [skill for skill, chance in COMPETENCIAS.items() if rng.random() < chance] or ['Excel']
+        if rng.random() < 0.1:
+            competencias += rng.sample(OUTRAS_COMPETENCIAS, rng.randint(1, 2))
+        modalidades = [modalidade for modalidade, chance in MODALIDADES if rng.random() < chance] or ['Estágio de Férias']
+
+        yield {
+            'nome': nome,
+            'email': email,
+            'universidade': universidade,
+            'curso': _cursos.draw(rng),
+            'ano_graduacao': _anos.draw(rng),
+            'telefone': f'({rng.choice(DDDS[estado])}) 9{rng.randrange(10000):04d}-{rng.randrange(10000):04d}',
+            'cidade': cidade,
+            'estado': estado,
+            'pais': 'Brasil' if rng.random() < 0.98 else 'Brazil',
+            'cpf': cpf_with_check_digits(f'{(index * 387_420_489 + cpf_offset) % 10 ** 9:09d}'),
+            'modalidade_estagio': '; '.join(modalidades),
+            'competencias': competencias,
+            'ja_estagiou': rng.random() < 0.35,
+            'autoriza_dados': rng.random() < 0.95,
+        }
+
+
+def spreadsheet_rows(alunos, seed=0):
+    """Yields one upload row per student, with every ALL_COLUMNS header.
+
+    Ingesting the rows gives back the students: the extra columns are drawn
+    from their own generator, and skill spellings map back through the skill table.
+    """
+    from spreadsheet import ALL_COLUMNS
+
+    rng = random.Random(seed + 1)
+    sim_nao = ('Sim', 'Não')
+    for aluno in alunos:
+        competencias = [skill for skill in aluno['competencias'] if skill in COMPETENCIAS]
+        outras = [skill for skill in aluno['competencias'] if skill not in COMPETENCIAS]
+        listed = [rng.choice(GRAFIAS[skill]) if skill in GRAFIAS and rng.random() < 0.2 else skill for skill in competencias]
+        if outras:
+            listed.append('Outras')
+
+        dominio_universidade = _dominios_universidade[aluno['universidade']]
+        ingresso = aluno['ano_graduacao'] - rng.choice((4, 5, 5, 6))
+        nascimento = f'{rng.randint(1, 28):02d}/{rng.randint(1, 12):02d}/{(ingresso - rng.choice((17, 18, 19))) % 100:02d}'
+        genero = _generos[aluno['nome'].split()[0]]
+
+        row = dict.fromkeys(ALL_COLUMNS)
+        row.update({
+            'Nome': aluno['nome'],
+            'Email de contato': aluno['email'],
+            'Universidade': aluno['universidade'],
+            'Curso': aluno['curso'],
+            'Ano de graduação': aluno['ano_graduacao'],
+            'Telefone': aluno['telefone'],
+            'Cidade': aluno['cidade'],
+            'Estado': aluno['estado'],
+            'País': aluno['pais'],
+            'CPF (só números)': aluno['cpf'],
+            'Modalidades de estágio buscadas': aluno['modalidade_estagio'],
+            'Competências': ', '.join(listed),
+            'Já estagiou?/ Está estagiando?': sim_nao[not aluno['ja_estagiou']],
+            'Você autoriza o compartilhamento dos seus dados para os bancos de talentos das empresas presentes no WI34?': sim_nao[not aluno['autoriza_dados']],
+            'Email institucional': (
+                aluno['email'].split('@')[0] + '@' + dominio_universidade if dominio_universidade is not None else None
+            ),
+            'Aberto a propostas de trabalho': rng.choice(sim_nao),
+            'Áreas de interesse': ', '.join(rng.sample(AREAS, rng.randint(1, 3))),
+            'Organizações estudantis': rng.choice(ORGANIZACOES) if rng.random() < 0.4 else None,
+            'LinkedIn': f"https://www.linkedin.com/in/{aluno['email'].split('@')[0].replace('.', '-')}",
+            'Currículo': f'https://drive.google.com/file/d/{rng.getrandbits(96):024x}',
+            'Etnia': _etnias.draw(rng),
+            'Gênero': GENEROS[genero] if rng.random() < 0.97 else 'Prefiro não responder',
+            'PCD': 'Sim' if rng.random() < 0.03 else 'Não',
+            'LGBTQIA+': rng.choice(('Sim', 'Não', 'Não', 'Não', 'Prefiro não responder')),
+            'Data de nascimento (DD/MM/AA)': nascimento,
+            'Ano de ingresso na universidade': ingresso,
+            'Previsão Formatura': f"{rng.choice(('06', '12'))}/{aluno['ano_graduacao']}",
+            'Nível de Espanhol': rng.choice(NIVEIS),
+            'Nível de Inglês': rng.choice(NIVEIS),
+            'Nível de Excel': rng.choice(NIVEIS),
+            'Setores de Interesse': ', '.join(rng.sample(AREAS, rng.randint(1, 2))),
+            'Qual é a primeira empresa que vem a sua mente quando pensa em estagiar?': rng.choice(EMPRESAS),
+            'Caso tenha outras competências, indique quais': ', '.join(outras) or None,
+            'Se sim, em qual setor(es)?': rng.choice(AREAS) if aluno['ja_estagiou'] else None,
+        })
+        yield row
+
+
+def write_xlsx(path, n, seed=0):
+    import openpyxl
+    from spreadsheet import ALL_COLUMNS
+
+    # write_only keeps one row in memory at a time.
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append(ALL_COLUMNS)
+    for row in spreadsheet_rows(generate_alunos(n, seed), seed):
+        sheet.append([row[col] for col in ALL_COLUMNS])
+    workbook.save(path)
+
+
+def generate_dataset(n, seed=0):
+    from dataset import Dataset
+
+    return Dataset(generate_alunos(n, seed))
+
+
+def write_snapshot_file(path, n, seed=0, chunk_size=10_000):
+    from collections import Counter
+
+    from dataset import Dataset
+    from facets import FACET_FIELDS, FacetIndex
+    from snapshot import write_snapshot
+    from store import StudentStore
+
+    # Filled directly: the students are valid by construction, and a Dataset
+    # made from a ready store leaves its search indexes unbuilt.
+    store = StudentStore()
+    counts = {name: Counter() for name in FACET_FIELDS}
+    alunos = generate_alunos(n, seed)
+    while chunk := list(islice(alunos, chunk_size)):
+        store.extend(chunk)
+        for name, values_of in FACET_FIELDS.items():
+            for aluno in chunk:
+                counts[name].update(values_of(aluno))
+
+    write_snapshot(Dataset(store=store, facets=FacetIndex.from_counts(counts)), path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera alunos sintéticos determinísticos")
+    parser.add_argument('n', type=int, help="número de alunos")
+    parser.add_argument('--seed', type=int, default=0)
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument('--xlsx', help="planilha no formato de upload")
+    output.add_argument('--snapshot', help="snapshot binário (veja STUDENTS_SNAPSHOT)")
+    args = parser.parse_args()
+
+    if args.xlsx:
+        write_xlsx(args.xlsx, args.n, args.seed)
+        print(f"{args.n} alunos gravados em {args.xlsx}")
+    else:
+        write_snapshot_file(args.snapshot, args.n, args.seed)
+        print(f"{args.n} alunos gravados em {args.snapshot}")
+
+
+if __name__ == '__main__':
+    main()
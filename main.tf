@@ -45,6 +45,10 @@ resource "aws_iam_role_policy_attachment" "lambda_policy" {
 resource "aws_api_gateway_rest_api" "fastapi_api" {
   name        = "fastapi_api"
   description = "API Gateway for FastAPI application"
+
+  # Compressed and MessagePack bodies leave Lambda base64-encoded; API Gateway
+  # only decodes them back to binary for media types listed here.
+  binary_media_types = ["*/*"]
 }
 
 resource "aws_api_gateway_resource" "proxy" {
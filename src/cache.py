@@ -0,0 +1,89 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(16 * 1024 * 1024)))
+
+
+class CachedBody(NamedTuple):
+    body: bytes
+    etag: str
+
+
+class Variant(NamedTuple):
+    etag: str
+    encoding: str
+
+
+def make_etag(body):
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match, etag):
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    # If-None-Match uses the weak comparison, so a W/ prefix is ignored.
+    candidates = (tag.strip().removeprefix('W/') for tag in if_none_match.split(','))
+    return etag in candidates
+
+
+class ResponseCache:
+    """LRU of encoded response bodies, bounded by their total size in bytes.
+
+    Next to the bodies it remembers, per key, the ETag and Content-Encoding of
+    the response last served for it. Those are kept even for bodies too large
+    to cache, so a matching If-None-Match is answered without rebuilding them.
+    """
+
+    def __init__(self, max_bytes=RESPONSE_CACHE_MAX_BYTES, max_variants=4096):
+        self.max_bytes = max_bytes
+        self.max_variants = max_variants
+        self.size = 0
+        self._entries = OrderedDict()
+        self._variants = OrderedDict()
+        self._lock = threading.Lock()
+
+    def variant(self, key):
+        with self._lock:
+            variant = self._variants.get(key)
+            if variant is not None:
+                self._variants.move_to_end(key)
+            return variant
+
+    def remember(self, key, etag, encoding):
+        with self._lock:
+            self._variants[key] = Variant(etag, encoding)
+            self._variants.move_to_end(key)
+            if len(self._variants) > self.max_variants:
+                self._variants.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def fits(self, body):
+        return len(body) <= self.max_bytes
+
+    def put(self, key, body):
+        entry = CachedBody(body, make_etag(body))
+        if not self.fits(body):
+            return entry
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+            self._entries[key] = entry
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.body)
+        return entry
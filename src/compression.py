@@ -0,0 +1,126 @@
+import os
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_LEVEL = int(os.environ.get('COMPRESSION_LEVEL', '6'))
+# Cached bodies are compressed once and served many times, so they get the slow settings.
+PRECOMPRESSION_LEVEL = 9
+
+COMPRESSIBLE_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/msgpack',
+    'text/',
+)
+
+# In order of preference when the client accepts several.
+CODINGS = ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def choose_encoding(accept_encoding):
+    weights = {}
+    for part in (accept_encoding or '').split(','):
+        coding, *params = [piece.strip().lower() for piece in part.split(';')]
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    best, best_q = 'identity', 0.0
+    for coding in CODINGS:
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def compressor(coding, level=COMPRESSION_LEVEL):
+    if coding == 'gzip':
+        stream = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return lambda data, last: stream.compress(data) + stream.flush(zlib.Z_FINISH if last else zlib.Z_SYNC_FLUSH)
+
+    stream = brotli.Compressor(quality=min(level, 11))
+    return lambda data, last: stream.process(data) + (stream.finish() if last else stream.flush())
+
+
+def compress(body, coding, level=COMPRESSION_LEVEL):
+    return compressor(coding, level)(body, True)
+
+
+def is_compressible(content_type):
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+
+class CompressionMiddleware:
+    """gzip/brotli for responses of at least `minimum_size` bytes.
+
+    Streamed responses are always compressed, chunk by chunk. Responses that
+    already carry a Content-Encoding (precompressed cache entries) pass through.
+    """
+
+    def __init__(self, app, minimum_size=COMPRESSION_MIN_SIZE, level=COMPRESSION_LEVEL):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.level = level
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        coding = choose_encoding(Headers(scope=scope).get('accept-encoding'))
+        if coding == 'identity':
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compress_chunk = None
+
+        async def send_compressed(message):
+            nonlocal start, compress_chunk
+            if message['type'] == 'http.response.start':
+                start = message
+                return
+            if message['type'] != 'http.response.body':
+                await send(message)
+                return
+
+            body = message.get('body', b'')
+            last = not message.get('more_body', False)
+            if start is not None:
+                headers = MutableHeaders(scope=start)
+                if self._should_compress(headers, body, last):
+                    compress_chunk = compressor(coding, self.level)
+                    message = {**message, 'body': compress_chunk(body, last)}
+                    headers['content-encoding'] = coding
+                    headers.add_vary_header('Accept-Encoding')
+                    if last:
+                        headers['content-length'] = str(len(message['body']))
+                    else:
+                        del headers['content-length']
+                await send(start)
+                start = None
+            elif compress_chunk is not None:
+                message = {**message, 'body': compress_chunk(body, last)}
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
+
+    def _should_compress(self, headers, body, last):
+        return (
+            'content-encoding' not in headers
+            and is_compressible(headers.get('content-type', ''))
+            and (not last or len(body) >= self.minimum_size)
+        )
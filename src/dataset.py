@@ -0,0 +1,167 @@
+import itertools
+import re
+import threading
+from collections import Counter
+from typing import NamedTuple
+
+from pydantic import ValidationError
+
+from facets import FacetIndex
+from models import ALUNO_ADAPTER
+from search import InvertedIndex
+from skills import SKILL_TABLE
+from sorting import SortIndex
+from store import ALUNO_FIELDS, StudentStore
+from text import TextIndex
+
+
+# Versions are unique across Dataset instances, so caches keyed by version never go stale.
+_versions = itertools.count(1)
+
+
+def cpf_key(cpf):
+    return re.sub(r'\D', '', cpf)
+
+
+def email_key(email):
+    return email.strip().lower()
+
+
+class Snapshot(NamedTuple):
+    version: int
+    size: int
+    facets: dict
+
+
+class Extended(NamedTuple):
+    snapshot: Snapshot
+    duplicated: int
+    invalid: int
+    unmapped: Counter
+
+
+class Dataset:
+    """The served students plus every index derived from them.
+
+    A student's id is its row number, which never changes because rows are
+    only ever appended. Records are validated against Aluno once, on the way
+    in, and their skills are put in canonical form (see skills.SKILL_TABLE),
+    so everything read back from the store can be served as-is.
+
+    Writers are serialized by a lock: rows and postings past the published
+    size are invisible, and the new snapshot is swapped in with a single
+    assignment once everything is in place. Readers grab `dataset.snapshot`
+    once per request and never lock.
+    """
+
+    def __init__(self, alunos=(), store=None, facets=None, text=None):
+        self.store = store or StudentStore()
+        self.facets = facets or FacetIndex()
+        self.snapshot = Snapshot(next(_versions), len(self.store), self.facets.view())
+        self._writer = threading.RLock()
+        # Built from the store on first use when it was loaded ready-made (see from_snapshot);
+        # snapshots carry the text index, which is too slow to build inside a request.
+        self._search = InvertedIndex() if store is None else None
+        self._text = text if text is not None or store is not None else TextIndex()
+        self._sorts = SortIndex(self.store) if store is None else None
+        self._keys = ({}, {}) if store is None else None
+        SKILL_TABLE.register(self.store.columns['competencias'].categories)
+        self.extend(alunos)
+
+    @classmethod
+    def from_snapshot(cls, path):
+        from snapshot import read_snapshot
+
+        store, facets, text = read_snapshot(path)
+        return cls(store=store, facets=facets, text=text)
+
+    @property
+    def search(self):
+        if self._search is None:
+            with self._writer:
+                if self._search is None:
+                    self._search = InvertedIndex.from_store(self.store)
+        return self._search
+
+    @property
+    def text(self):
+        if self._text is None:
+            with self._writer:
+                if self._text is None:
+                    self._text = TextIndex.from_store(self.store)
+        return self._text
+
+    @property
+    def sorts(self):
+        if self._sorts is None:
+            with self._writer:
+                if self._sorts is None:
+                    self._sorts = SortIndex(self.store)
+        return self._sorts
+
+    @property
+    def keys(self):
+        if self._keys is None:
+            with self._writer:
+                if self._keys is None:
+                    cpfs, emails = self.store.columns['cpf'], self.store.columns['email']
+                    rows = range(len(self.store))
+                    self._keys = (
+                        {cpf_key(cpfs[row]): row for row in rows},
+                        {email_key(emails[row]): row for row in rows},
+                    )
+        return self._keys
+
+    def extend(self, alunos):
+        alunos = list(alunos)
+        if not alunos:
+            return Extended(self.snapshot, 0, 0, Counter())
+
+        with self._writer:
+            search, text, sorts = self.search, self.text, self.sorts
+            by_cpf, by_email = self.keys
+            new = []
+            new_cpfs, new_emails = {}, {}
+            duplicated = invalid = 0
+            unmapped = Counter()
+            for aluno in alunos:
+                row = len(self.store) + len(new)
+                try:
+                    aluno = ALUNO_ADAPTER.validate_python({**aluno, 'id': row}).model_dump()
+                except ValidationError:
+                    invalid += 1
+                    continue
+
+                cpf, email = cpf_key(aluno['cpf']), email_key(aluno['email'])
+                if cpf in by_cpf or cpf in new_cpfs or email in by_email or email in new_emails:
+                    duplicated += 1
+                    continue
+                new_cpfs[cpf] = row
+                new_emails[email] = row
+                aluno['competencias'], terms = SKILL_TABLE.canonicalize(aluno['competencias'])
+                unmapped.update(terms)
+                new.append(aluno)
+
+            # Nothing new: keep the version, so caches keyed by it stay valid.
+            if new:
+                self.store.extend(new)
+                # Keys are registered only once their rows are in the store.
+                by_cpf.update(new_cpfs)
+                by_email.update(new_emails)
+                search.add(new)
+                text.add(new)
+                sorts.add()
+                self.facets.add(new)
+                self.snapshot = Snapshot(next(_versions), len(self.store), self.facets.view())
+        return Extended(self.snapshot, duplicated, invalid, unmapped)
+
+    def get(self, row, size=None, fields=ALUNO_FIELDS):
+        if 0 <= row < (self.snapshot.size if size is None else size):
+            return self.store.row(row, fields)
+        return None
+
+    def lookup(self, cpf=None, email=None):
+        size = self.snapshot.size
+        by_cpf, by_email = self.keys
+        row = by_cpf.get(cpf_key(cpf)) if cpf is not None else by_email.get(email_key(email))
+        return self.get(row, size) if row is not None else None
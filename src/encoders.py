@@ -0,0 +1,65 @@
+import json
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+JSON = 'application/json'
+MSGPACK = 'application/msgpack'
+
+
+def encode_json(content):
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+
+
+def encode_msgpack(content):
+    return msgpack.packb(content, use_bin_type=True)
+
+
+ENCODERS = {JSON: encode_json}
+ALIASES = {}
+if msgpack is not None:
+    ENCODERS[MSGPACK] = encode_msgpack
+    ALIASES['application/x-msgpack'] = MSGPACK
+
+
+def negotiate(accept):
+    """Pick the supported media type the Accept header prefers; JSON when nothing matches."""
+    best, best_q = JSON, 0.0
+    for part in (accept or '').split(','):
+        media_type, *params = [piece.strip() for piece in part.split(';')]
+        media_type = ALIASES.get(media_type.lower(), media_type.lower())
+        q = 1.0
+        for param in params:
+            if param.startswith('q='):
+                try:
+                    q = float(param[2:])
+                except ValueError:
+                    q = 0.0
+        if media_type in ('*/*', 'application/*'):
+            media_type = JSON
+        # Ties keep the earlier entry, so the client's own order wins.
+        if media_type in ENCODERS and q > best_q:
+            best, best_q = media_type, q
+    return best
+
+
+def encode(content, media_type):
+    return ENCODERS[media_type](content)
+
+
+class FastJSONResponse(JSONResponse):
+
+    def render(self, content):
+        return encode_json(content)
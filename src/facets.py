@@ -0,0 +1,62 @@
+from collections import Counter
+from itertools import islice
+
+
+FACET_FIELDS = {
+    'universities': lambda aluno: (aluno['universidade'],),
+    'courses': lambda aluno: (aluno['curso'],),
+    'skills': lambda aluno: aluno['competencias'],
+}
+
+
+class FacetIndex:
+
+    def __init__(self, alunos=()):
+        self.counts = {name: Counter() for name in FACET_FIELDS}
+        self.values = {name: [] for name in FACET_FIELDS}
+        self.skill_mentions = []
+        self.skill_ranking = []
+        self.add(alunos)
+
+    def add(self, alunos):
+        changed = set()
+        for aluno in alunos:
+            for name, values_of in FACET_FIELDS.items():
+                counts = self.counts[name]
+                for value in values_of(aluno):
+                    counts[value] += 1
+                    changed.add(name)
+
+        self._refresh(changed)
+
+    @classmethod
+    def from_counts(cls, counts):
+        index = cls()
+        for name, values in counts.items():
+            index.counts[name].update(values)
+        index._refresh(set(counts))
+        return index
+
+    def _refresh(self, changed):
+        # Readers only ever see fully built lists: each one is replaced, never mutated.
+        for name in changed:
+            if len(self.values[name]) != len(self.counts[name]):
+                self.values[name] = sorted(self.counts[name])
+        if 'skills' in changed:
+            self.skill_mentions = [
+                skill
+                for skill in self.values['skills']
+                for _ in range(self.counts['skills'][skill])
+            ]
+            self.skill_ranking = sorted(self.counts['skills'].items(), key=lambda item: (-item[1], item[0]))
+
+    def view(self):
+        return {**self.values, 'skill_mentions': self.skill_mentions, 'skill_ranking': self.skill_ranking}
+
+
+def top_skills(ranking, top_k=None, prefix=None):
+    """The first `top_k` (skill, count) pairs of a ranking, optionally only skills starting with `prefix`."""
+    if prefix:
+        prefix = prefix.casefold()
+        ranking = (item for item in ranking if item[0].casefold().startswith(prefix))
+    return [{'skill': skill, 'count': count} for skill, count in islice(ranking, top_k)]
@@ -0,0 +1,164 @@
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from spreadsheet import REQUIRED_COLUMNS, iter_spreadsheet_records
+
+
+UPLOAD_JOB_STORE = os.environ.get('UPLOAD_JOB_STORE', 'memory')
+UPLOAD_JOB_DIR = os.environ.get('UPLOAD_JOB_DIR', os.path.join(tempfile.gettempdir(), 'upload_jobs'))
+# In-memory jobs hold their whole result, so only a few recent ones are kept.
+UPLOAD_JOB_MAX = int(os.environ.get('UPLOAD_JOB_MAX', '8'))
+UPLOAD_JOB_TTL = float(os.environ.get('UPLOAD_JOB_TTL', '900'))
+PROGRESS_EVERY = 500
+
+
+def new_job():
+    return {
+        'id': uuid.uuid4().hex,
+        'status': 'pending',
+        'rows_parsed': 0,
+        'rows_rejected': 0,
+        'error': None,
+    }
+
+
+class InMemoryJobStore:
+    """Jobs and their results, dropped `ttl` seconds after creation or once
+    more than `max_jobs` newer ones exist, whichever comes first."""
+
+    def __init__(self, max_jobs=UPLOAD_JOB_MAX, ttl=UPLOAD_JOB_TTL):
+        self.max_jobs = max_jobs
+        self.ttl = ttl
+        self._jobs = OrderedDict()
+        self._created = {}
+        self._results = {}
+        self._lock = threading.Lock()
+
+    def _evict(self, now):
+        # Oldest first, so the loop stops at the first job worth keeping.
+        while self._jobs:
+            job_id = next(iter(self._jobs))
+            if len(self._jobs) <= self.max_jobs and now - self._created[job_id] < self.ttl:
+                break
+            del self._jobs[job_id]
+            del self._created[job_id]
+            self._results.pop(job_id, None)
+
+    def create(self):
+        job = new_job()
+        now = time.monotonic()
+        with self._lock:
+            self._jobs[job['id']] = job
+            self._created[job['id']] = now
+            self._evict(now)
+        return dict(job)
+
+    def get(self, job_id):
+        with self._lock:
+            self._evict(time.monotonic())
+            job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    def update(self, job_id, **fields):
+        # A job evicted while running keeps running; its updates are dropped.
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id] = {**self._jobs[job_id], **fields}
+
+    def set_result(self, job_id, records):
+        with self._lock:
+            if job_id in self._jobs:
+                self._results[job_id] = records
+
+    def result(self, job_id, start=0, end=None):
+        return self._results.get(job_id, [])[start:end]
+
+
+class FileJobStore:
+    """One JSON file per job plus an NDJSON file with its result; meant for local testing."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id, suffix):
+        if not job_id.isalnum():
+            raise KeyError(job_id)
+        return os.path.join(self.directory, f'{job_id}{suffix}')
+
+    def _write(self, job):
+        path = self._path(job['id'], '.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(job, f)
+        os.replace(path + '.tmp', path)
+
+    def create(self):
+        job = new_job()
+        self._write(job)
+        return job
+
+    def get(self, job_id):
+        try:
+            with open(self._path(job_id, '.json')) as f:
+                return json.load(f)
+        except (KeyError, FileNotFoundError):
+            return None
+
+    def update(self, job_id, **fields):
+        self._write({**self.get(job_id), **fields})
+
+    def set_result(self, job_id, records):
+        path = self._path(job_id, '.ndjson')
+        with open(path + '.tmp', 'w') as f:
+            for record in records:
+                f.write(json.dumps(record, ensure_ascii=False) + '\n')
+        os.replace(path + '.tmp', path)
+
+    def result(self, job_id, start=0, end=None):
+        try:
+            with open(self._path(job_id, '.ndjson')) as f:
+                records = []
+                for i, line in enumerate(f):
+                    if end is not None and i >= end:
+                        break
+                    if i >= start:
+                        records.append(json.loads(line))
+                return records
+        except (KeyError, FileNotFoundError):
+            return []
+
+
+def job_store_from_env():
+    if UPLOAD_JOB_STORE == 'file':
+        return FileJobStore(UPLOAD_JOB_DIR)
+    if UPLOAD_JOB_STORE == 'memory':
+        return InMemoryJobStore()
+    raise ValueError(f"UPLOAD_JOB_STORE deve ser 'memory' ou 'file', não {UPLOAD_JOB_STORE!r}")
+
+
+def run_upload_job(store, job_id, path):
+    store.update(job_id, status='running')
+    accepted = []
+    rejected = 0
+    try:
+        with open(path, 'rb') as f:
+            for parsed, record in enumerate(iter_spreadsheet_records(f), start=1):
+                if any(record[col] is None for col in REQUIRED_COLUMNS):
+                    rejected += 1
+                else:
+                    accepted.append(record)
+                if parsed % PROGRESS_EVERY == 0:
+                    store.update(job_id, rows_parsed=parsed, rows_rejected=rejected)
+
+        store.set_result(job_id, accepted)
+        store.update(job_id, status='done', rows_parsed=len(accepted) + rejected, rows_rejected=rejected)
+    except Exception as e:
+        detail = getattr(e, 'detail', None) or str(e)
+        store.update(job_id, status='failed', error=detail)
+    finally:
+        os.remove(path)
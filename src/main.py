@@ -1,17 +1,58 @@
 import json
-import io
+import os
 import re
+import shutil
+import sys
+import tempfile
+from typing import Literal
 
-from fastapi import FastAPI, HTTPException, UploadFile, File
+from fastapi import FastAPI, HTTPException, UploadFile, File, Query, Depends, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.responses import Response, StreamingResponse
 from mangum import Mangum
-import pandas as pd
 
-from fake_alunos import FAKE_ALUNOS
+from cache import ResponseCache, etag_matches
+from compression import (
+    COMPRESSION_LEVEL,
+    COMPRESSION_MIN_SIZE,
+    PRECOMPRESSION_LEVEL,
+    CompressionMiddleware,
+    choose_encoding,
+    compress,
+)
+from dataset import Dataset
+from encoders import FastJSONResponse, encode, negotiate
+from facets import top_skills
+from jobs import job_store_from_env, run_upload_job
+from models import Aluno, AlunosBatch, AlunosBatchRequest, AlunosPage, AlunosSearchPage, Facets, SkillStats
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, bitset_page, page_bounds, ranked_page, sorted_page
+from skills import SKILL_TABLE
+from spreadsheet import iter_spreadsheet_records, read_alunos, spreadsheet_to_json
+from store import ALUNO_FIELDS
+from uploads import BodySizeLimitMiddleware, parser_source
+from workers import JOB_POOL, PARSER_POOL
+
+
+app = FastAPI(default_response_class=FastJSONResponse)
+
+COUNTED_FACETS = ('competencias', 'universidade', 'curso', 'estado', 'ano_graduacao')
+
+STUDENTS_SNAPSHOT = os.environ.get('STUDENTS_SNAPSHOT')
+
 
+def load_dataset():
+    if STUDENTS_SNAPSHOT:
+        return Dataset.from_snapshot(STUDENTS_SNAPSHOT)
 
-app = FastAPI()
+    from fake_alunos import FAKE_ALUNOS
+
+    return Dataset(FAKE_ALUNOS)
+
+
+DATASET = load_dataset()
+RESPONSE_CACHE = ResponseCache()
+JOBS = job_store_from_env()
 
 
 app.add_middleware(
@@ -21,156 +62,360 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-
-class Aluno(BaseModel):
-    nome: str
-    email: str
-    universidade: str
-    curso: str
-    ano_graduacao: int
-    telefone: str
-    cidade: str
-    estado: str
-    pais: str
-    cpf: str
-    modalidade_estagio: str
-    competencias: list
-    ja_estagiou: bool
-    autoriza_dados: bool
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(BodySizeLimitMiddleware)
+
+
+def field_projection(
+    fields: str | None = Query(None, description="Campos a retornar, separados por vírgula"),
+):
+    if fields is None:
+        return None
+
+    requested = {field.strip() for field in fields.split(',') if field.strip()}
+    unknown = sorted(requested - set(ALUNO_FIELDS))
+    if unknown or not requested:
+        raise HTTPException(status_code=400, detail=f"Campos inválidos: {unknown}")
+    return tuple(field for field in ALUNO_FIELDS if field in requested)
+
+
+def search_filters(
+    competencias: list[str] = Query([]),
+    universidade: list[str] = Query([]),
+    curso: list[str] = Query([]),
+    estado: list[str] = Query([]),
+    modalidade_estagio: list[str] = Query([]),
+    ano_graduacao_min: int | None = None,
+    ano_graduacao_max: int | None = None,
+    ja_estagiou: bool | None = None,
+):
+    filters = {
+        'competencias': SKILL_TABLE.search_terms(competencias),
+        'universidade': universidade,
+        'curso': curso,
+        'estado': estado,
+        'modalidade_estagio': modalidade_estagio,
+        'ja_estagiou': [] if ja_estagiou is None else [ja_estagiou],
+    }
+    ranges = {'ano_graduacao': (ano_graduacao_min, ano_graduacao_max)}
+    return filters, ranges
+
+
+# Students are validated once when they enter the dataset (see Dataset.extend).
+# The Aluno endpoints below encode their content themselves so FastAPI does not
+# validate and copy every record again on each request; response_model still
+# documents them.
+@app.get("/alunos/search", response_model=AlunosSearchPage)
+async def search_alunos(
+    request: Request,
+    filters=Depends(search_filters),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    q: str | None = None,
+):
+    snapshot = DATASET.snapshot
+    bits = DATASET.search.match(*filters, size=snapshot.size)
+    if q:
+        ranked, total = DATASET.text.search(q, bits, snapshot.size)
+        rows, next_cursor = ranked_page(ranked, cursor, limit, total)
+    else:
+        rows, next_cursor = bitset_page(bits, cursor, limit)
+        total = bits.bit_count()
+    return _encoded(request, {
+        'items': DATASET.store.rows(rows),
+        'next_cursor': next_cursor,
+        'total': total,
+    })
+
+
+@app.get("/alunos/lookup", response_model=Aluno)
+async def lookup_aluno(request: Request, cpf: str | None = None, email: str | None = None):
+    if cpf is None and email is None:
+        raise HTTPException(status_code=400, detail="Informe cpf ou email")
+
+    aluno = DATASET.lookup(cpf=cpf, email=email)
+    if aluno is None:
+        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+    return _encoded(request, aluno)
+
+
+@app.get("/alunos/batch", response_model=AlunosBatch)
+async def get_alunos_batch(request: Request, ids: str = Query(..., pattern=r"^\d{1,10}(,\d{1,10})*$")):
+    ids = [int(aluno_id) for aluno_id in ids.split(',')]
+    if len(ids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"No máximo {MAX_PAGE_SIZE} ids por requisição")
+    return _batch(request, ids)
+
+
+@app.post("/alunos/batch", response_model=AlunosBatch)
+async def post_alunos_batch(request: Request, body: AlunosBatchRequest):
+    return _batch(request, body.ids)
+
+
+def _batch(request, ids):
+    size = DATASET.snapshot.size
+    items = []
+    missing = []
+    for aluno_id in ids:
+        aluno = DATASET.get(aluno_id, size)
+        if aluno is None:
+            missing.append(aluno_id)
+        else:
+            items.append(aluno)
+    return _encoded(request, {'items': items, 'missing': missing})
 
 
 @app.get("/alunos/{aluno_id}", response_model=Aluno)
-async def get_aluno(aluno_id: int):
-    return FAKE_ALUNOS[0]
-
-
-@app.get("/alunos", response_model=list[Aluno])
-async def get_alunos():
-    return FAKE_ALUNOS
+async def get_aluno(request: Request, aluno_id: int, fields=Depends(field_projection)):
+    aluno = DATASET.get(aluno_id, fields=fields or ALUNO_FIELDS)
+    if aluno is None:
+        raise HTTPException(status_code=404, detail="Aluno não encontrado")
+    return _encoded(request, aluno)
+
+
+@app.get("/alunos", response_model=list[Aluno] | AlunosPage)
+async def get_alunos(
+    request: Request,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields=Depends(field_projection),
+    sort: Literal['nome', 'ano_graduacao', 'universidade', 'cidade'] | None = None,
+    order: Literal['asc', 'desc'] = 'asc',
+):
+    def build(snapshot):
+        if limit is None and cursor is None:
+            if sort is None:
+                rows = range(snapshot.size)
+            else:
+                rows, _ = DATASET.sorts.page(sort, order == 'desc', None, snapshot.size, snapshot.size)
+            return DATASET.store.rows(rows, fields or ALUNO_FIELDS)
+
+        if sort is None:
+            start, end, next_cursor = page_bounds(cursor, limit, snapshot.size)
+            rows = range(start, end)
+        else:
+            rows, next_cursor = sorted_page(
+                DATASET.sorts, sort, order == 'desc', cursor, limit or DEFAULT_PAGE_SIZE, snapshot.size
+            )
+        return {
+            'items': DATASET.store.rows(rows, fields or ALUNO_FIELDS),
+            'next_cursor': next_cursor,
+        }
+
+    return _cached(request, build)
 
 
 @app.get("/university")
-def get_universities():
-    return {
-    'universities': list({aluno['universidade'] for aluno in FAKE_ALUNOS})
-    }
+async def get_universities(request: Request):
+    return _cached(request, lambda snapshot: {
+        'universities': snapshot.facets['universities']
+    })
 
 
 @app.get("/course")
-def get_courses():
-    return {
-    'courses': list({aluno['curso'] for aluno in FAKE_ALUNOS})
-    }
+async def get_courses(request: Request):
+    return _cached(request, lambda snapshot: {
+        'courses': snapshot.facets['courses']
+    })
 
 
 @app.get("/skill")
-def get_skills():
-    skills = []
-    for aluno in FAKE_ALUNOS:
-        skills.extend(aluno['competencias'])
-    return {
-        'skills': skills
-    }
+async def get_skills(request: Request):
+    return _cached(request, lambda snapshot: {
+        'skills': snapshot.facets['skill_mentions']
+    })
+
+
+@app.get("/skill/stats", response_model=SkillStats)
+async def get_skill_stats(
+    request: Request,
+    top_k: int | None = Query(None, ge=1, le=sys.maxsize),
+    prefix: str | None = None,
+):
+    def build(snapshot):
+        ranking = snapshot.facets['skill_ranking']
+        return {'total': len(ranking), 'skills': top_skills(ranking, top_k, prefix)}
+
+    return _cached(request, build)
 
 
 @app.get("/filter_options")
-def get_filter_options():
-    return {
-        'universities': list({aluno['universidade'] for aluno in FAKE_ALUNOS}),
-        'courses': list({aluno['curso'] for aluno in FAKE_ALUNOS}),
-        'skills': list({skill for aluno in FAKE_ALUNOS for skill in aluno['competencias']})
-    }
+async def get_filter_options(request: Request):
+    return _cached(request, lambda snapshot: {
+        'universities': snapshot.facets['universities'],
+        'courses': snapshot.facets['courses'],
+        'skills': snapshot.facets['skills'],
+    })
+
+
+def _encoded(request, content):
+    media_type = negotiate(request.headers.get('accept'))
+    return Response(encode(content, media_type), media_type=media_type, headers={'Vary': 'Accept'})
+
+
+@app.get("/facets", response_model=Facets)
+async def get_facets(request: Request, filters=Depends(search_filters)):
+    def build(snapshot):
+        bits = DATASET.search.match(*filters, size=snapshot.size)
+        return {
+            'total': bits.bit_count(),
+            'facets': DATASET.search.counts(bits, COUNTED_FACETS),
+        }
+
+    return _cached(request, build)
+
+
+def _cached(request, build):
+    snapshot = DATASET.snapshot
+    media_type = negotiate(request.headers.get('accept'))
+    key = (snapshot.version, media_type, request.url.path, tuple(sorted(request.query_params.multi_items())))
+    coding = choose_encoding(request.headers.get('accept-encoding'))
+    headers = {'Vary': 'Accept, Accept-Encoding'}
+
+    # Revalidations are answered from the remembered ETag, before any body is built.
+    served = RESPONSE_CACHE.variant(key + (coding,))
+    if served is not None and etag_matches(request.headers.get('if-none-match'), served.etag):
+        if served.encoding != 'identity':
+            headers['Content-Encoding'] = served.encoding
+        headers['ETag'] = served.etag
+        return Response(status_code=304, headers=headers)
+
+    # Compressed variants are cached next to the plain body, each with its own ETag,
+    # so CompressionMiddleware sees a Content-Encoding and leaves them alone. They are
+    # looked up first: the compressed form of a body too large to cache usually fits,
+    # and is then served without building the plain body again.
+    entry = RESPONSE_CACHE.get(key + (coding,)) if coding != 'identity' else None
+    encoding = coding if entry is not None else 'identity'
+    if entry is None:
+        entry = RESPONSE_CACHE.get(key + ('identity',))
+        if entry is None:
+            entry = RESPONSE_CACHE.put(key + ('identity',), encode(build(snapshot), media_type))
+
+        if coding != 'identity' and len(entry.body) >= COMPRESSION_MIN_SIZE:
+            # Level 9 only pays off for bodies the cache keeps alongside.
+            level = PRECOMPRESSION_LEVEL if RESPONSE_CACHE.fits(entry.body) else COMPRESSION_LEVEL
+            entry = RESPONSE_CACHE.put(key + (coding,), compress(entry.body, coding, level))
+            encoding = coding
+    if encoding != 'identity':
+        headers['Content-Encoding'] = encoding
+
+    RESPONSE_CACHE.remember(key + (coding,), entry.etag, encoding)
+    headers['ETag'] = entry.etag
+    if etag_matches(request.headers.get('if-none-match'), entry.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(entry.body, media_type=media_type, headers=headers)
 
 
 @app.post("/upload_spreadsheet")
-async def upload_spreadsheet(file: UploadFile = File(...)):
-    contents = await file.read()
-
+async def upload_spreadsheet(
+    file: UploadFile = File(...),
+    mode: Literal['json', 'stream', 'job', 'ingest'] = 'json',
+):
     if not re.match(r".*\.xlsx$", file.filename):
         return HTTPException(status_code=400, detail="Arquivo deve ser um .xlsx")
     elif not file.content_type == "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet":
         return HTTPException(status_code=400, detail="Arquivo deve ser um .xlsx") 
 
+    if mode == 'stream':
+        return await _stream_upload(file)
+    if mode == 'job':
+        return await _start_upload_job(file)
+    if mode == 'ingest':
+        return await _ingest_upload(file)
+
+    try:
+        parsed = await PARSER_POOL.run(spreadsheet_to_json, await parser_source(file, PARSER_POOL))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return Response(parsed, media_type="application/json")
+
+
+@app.get("/upload_jobs/{job_id}")
+async def get_upload_job(
+    job_id: str,
+    limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+):
+    job = JOBS.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job não encontrado")
+
+    if job['status'] == 'done':
+        if limit is None and cursor is None:
+            job['result'] = JOBS.result(job_id)
+        else:
+            total = job['rows_parsed'] - job['rows_rejected']
+            start, end, next_cursor = page_bounds(cursor, limit, total)
+            job['result'] = JOBS.result(job_id, start, end)
+            job['next_cursor'] = next_cursor
+    return job
+
+
+async def _stream_upload(file):
+    # The upload is closed once the handler returns, before the body is streamed.
+    spooled = tempfile.TemporaryFile()
+    await run_in_threadpool(shutil.copyfileobj, file.file, spooled)
+    spooled.seek(0)
+    records = iter_spreadsheet_records(spooled)
+    try:
+        first = await run_in_threadpool(next, records, None)
+    except HTTPException:
+        spooled.close()
+        raise
+    except Exception as e:
+        spooled.close()
+        raise HTTPException(status_code=500, detail=str(e))
+    return StreamingResponse(
+        _ndjson_lines(first, records, spooled),
+        media_type="application/x-ndjson",
+    )
+
+
+def _ndjson_lines(first, records, spooled):
+    try:
+        if first is not None:
+            yield json.dumps(first, ensure_ascii=False) + '\n'
+        for record in records:
+            yield json.dumps(record, ensure_ascii=False) + '\n'
+    finally:
+        records.close()
+        spooled.close()
+
+
+async def _start_upload_job(file):
+    fd, path = tempfile.mkstemp(suffix='.xlsx')
+    with os.fdopen(fd, 'wb') as spooled:
+        await run_in_threadpool(shutil.copyfileobj, file.file, spooled)
+
+    job = JOBS.create()
     try:
-        json_data = _spreadsheet_to_json(contents)
-        return json_data
+        JOB_POOL.submit(run_upload_job, JOBS, job['id'], path)
+    except HTTPException as e:
+        JOBS.update(job['id'], status='failed', error=e.detail)
+        os.remove(path)
+        raise
+    return FastJSONResponse(job, status_code=202, headers={'Location': f"/upload_jobs/{job['id']}"})
+
+
+async def _ingest_upload(file):
+    try:
+        alunos, rejected = await PARSER_POOL.run(read_alunos, await parser_source(file, PARSER_POOL))
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    extended = await run_in_threadpool(DATASET.extend, alunos)
+    return {
+        'rows_ingested': len(alunos) - extended.duplicated - extended.invalid,
+        'rows_rejected': rejected + extended.invalid,
+        'rows_duplicated': extended.duplicated,
+        'unmapped_skills': dict(extended.unmapped.most_common()),
+        'version': extended.snapshot.version,
+        'total': extended.snapshot.size,
+    }
 
-def _check_required_columns(df):
-    REQUIRED_COLUMNS = [
-        'Nome',
-        'Email de contato',
-        'Universidade',
-        'Curso',
-        'Ano de graduação',
-        'Telefone',
-        'Cidade',
-        'Estado',
-        'País',
-        'CPF (só números)',
-        'Modalidades de estágio buscadas',
-        'Competências',
-        'Já estagiou?/ Está estagiando?',
-        'Você autoriza o compartilhamento dos seus dados para os bancos de talentos das empresas presentes no WI34?',
-    ]
-
-    cols = []
-    for col in REQUIRED_COLUMNS:
-        if col not in df.columns:
-            cols.append(col)
-
-    if len(cols) > 0:
-        raise HTTPException(status_code=500, detail=f"Colunas {cols} não encontrada")
-
-
-def _spreadsheet_to_json(spreadsheet):
-
-    ALL_COLUMNS = [
-        'Nome',
-        'Email de contato',
-        'Universidade',
-        'Curso',
-        'Ano de graduação',
-        'Telefone',
-        'Cidade',
-        'Estado',
-        'País',
-        'CPF (só números)',
-        'Modalidades de estágio buscadas',
-        'Competências',
-        'Já estagiou?/ Está estagiando?',
-        'Você autoriza o compartilhamento dos seus dados para os bancos de talentos das empresas presentes no WI34?',
-        'Email institucional',
-        'Aberto a propostas de trabalho',
-        'Áreas de interesse',
-        'Organizações estudantis',
-        'LinkedIn',
-        'Currículo',
-        'Etnia',
-        'Gênero',
-        'PCD',
-        'LGBTQIA+',
-        'Data de nascimento (DD/MM/AA)',
-        'Ano de ingresso na universidade',
-        'Previsão Formatura',
-        'Nível de Espanhol',
-        'Nível de Inglês',
-        'Nível de Excel',
-        'Setores de Interesse',
-        'Qual é a primeira empresa que vem a sua mente quando pensa em estagiar?',
-        'Caso tenha outras competências, indique quais',
-        'Se sim, em qual setor(es)?',
-    ]
-
-    df = pd.read_excel(io.BytesIO(spreadsheet), usecols=ALL_COLUMNS)
-    _check_required_columns(df)
-
-    json_str = df.to_json(orient='records')
-    json_data = json.loads(json_str)
-    return json_data
-    
 
 lambda_handler = Mangum(app)
@@ -0,0 +1,70 @@
+from typing import Annotated
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+from pagination import MAX_PAGE_SIZE
+
+
+# ano_graduacao is stored in a 32-bit column (see store.IntColumn).
+class Aluno(BaseModel):
+    id: int
+    nome: str
+    email: str
+    universidade: str
+    curso: str
+    ano_graduacao: int = Field(ge=0, le=2**31 - 1)
+    telefone: str
+    cidade: str
+    estado: str
+    pais: str
+    cpf: str
+    modalidade_estagio: str
+    competencias: list
+    ja_estagiou: bool
+    autoriza_dados: bool
+
+
+class AlunosPage(BaseModel):
+    items: list[Aluno]
+    next_cursor: str | None
+
+
+class AlunosSearchPage(AlunosPage):
+    total: int
+
+
+class FacetCount(BaseModel):
+    value: str | int
+    count: int
+
+
+class Facets(BaseModel):
+    total: int
+    facets: dict[str, list[FacetCount]]
+
+
+class SkillCount(BaseModel):
+    skill: str
+    count: int
+
+
+class SkillStats(BaseModel):
+    total: int
+    skills: list[SkillCount]
+
+
+class AlunosBatch(BaseModel):
+    items: list[Aluno]
+    missing: list[int]
+
+
+# Ids are row numbers; bounding them keeps `missing` encodable by orjson and msgpack.
+AlunoId = Annotated[int, Field(ge=0, lt=2**31)]
+
+
+class AlunosBatchRequest(BaseModel):
+    ids: list[AlunoId] = Field(max_length=MAX_PAGE_SIZE)
+
+
+# Built once: the dataset validates every incoming record with it before storing it.
+ALUNO_ADAPTER = TypeAdapter(Aluno)
@@ -0,0 +1,75 @@
+import base64
+import binascii
+import json
+from itertools import islice
+
+from fastapi import HTTPException
+
+from search import iter_bits
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+def encode_cursor(state):
+    raw = json.dumps(state, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        state = json.loads(raw)
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+    if not isinstance(state, dict):
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return state
+
+
+def cursor_start(cursor):
+    if cursor is None:
+        return 0
+
+    after = decode_cursor(cursor).get('after')
+    if not isinstance(after, int) or after < -1:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    return after + 1
+
+
+def page_bounds(cursor, limit, total):
+    start = cursor_start(cursor)
+    end = min(start + (limit or DEFAULT_PAGE_SIZE), total)
+    next_cursor = encode_cursor({'after': end - 1}) if end < total else None
+    return start, max(start, end), next_cursor
+
+
+def bitset_page(bits, cursor, limit):
+    rows = []
+    for row in iter_bits(bits, cursor_start(cursor)):
+        if len(rows) == limit:
+            return rows, encode_cursor({'after': rows[-1]})
+        rows.append(row)
+    return rows, None
+
+
+def ranked_page(ranked, cursor, limit, total):
+    # Cursors over a ranking hold the position of the last row served, not its id.
+    start = cursor_start(cursor)
+    if start > total:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    rows = list(islice(ranked, start, start + limit + 1))
+    next_cursor = encode_cursor({'after': start + limit - 1}) if len(rows) > limit else None
+    return rows[:limit], next_cursor
+
+
+def sorted_page(sorts, field, descending, cursor, limit, size):
+    # Keyset cursor: it holds the last row served, which keeps its place in the
+    # order however many rows are added around it.
+    after = None if cursor is None else cursor_start(cursor) - 1
+    if after is not None and not 0 <= after < size:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+    rows, more = sorts.page(field, descending, after, limit, size)
+    return rows, encode_cursor({'after': rows[-1]}) if more else None
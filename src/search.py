@@ -0,0 +1,125 @@
+import sys
+from array import array
+from collections import defaultdict
+
+from store import CategoricalColumn, ListColumn
+
+
+SEARCH_FIELDS = {
+    'competencias': lambda aluno: aluno['competencias'],
+    'universidade': lambda aluno: (aluno['universidade'],),
+    'curso': lambda aluno: (aluno['curso'],),
+    'estado': lambda aluno: (aluno['estado'],),
+    'modalidade_estagio': lambda aluno: split_modalidades(aluno['modalidade_estagio']),
+    'ano_graduacao': lambda aluno: (aluno['ano_graduacao'],),
+    'ja_estagiou': lambda aluno: (aluno['ja_estagiou'],),
+}
+
+
+def split_modalidades(modalidades):
+    return tuple({m.strip() for m in modalidades.split(';') if m.strip()})
+
+
+def to_bitset(rows, nbits):
+    buf = bytearray((nbits + 7) // 8)
+    for row in rows:
+        buf[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buf, 'little')
+
+
+def iter_bits(bits, start=0):
+    # Shifting a large int costs as much as copying it, so the bits are copied
+    # out once and walked 64 at a time.
+    bits >>= start
+    words = array('Q', bits.to_bytes(-(-bits.bit_length() // 64) * 8, 'little'))
+    if sys.byteorder == 'big':
+        words.byteswap()
+    for index, word in enumerate(words):
+        while word:
+            low = word & -word
+            yield start + index * 64 + low.bit_length() - 1
+            word ^= low
+
+
+class InvertedIndex:
+    """Posting lists over row ids, stored as int bitsets (bit i set = row i matches)."""
+
+    def __init__(self, alunos=()):
+        self.postings = {field: {} for field in SEARCH_FIELDS}
+        self.size = 0
+        self.add(alunos)
+
+    @classmethod
+    def from_store(cls, store):
+        # Groups rows by dictionary code first, so categorical values are looked at
+        # once per distinct value instead of once per row.
+        index = cls()
+        size = len(store)
+        for field, values_of in SEARCH_FIELDS.items():
+            column = store.columns[field]
+            rows_by_value = defaultdict(list)
+            if isinstance(column, ListColumn):
+                codes, offsets = column.codes, column.offsets
+                for row in range(size):
+                    for code in codes[offsets[row]:offsets[row + 1]]:
+                        rows_by_value[column.categories[code]].append(row)
+            elif isinstance(column, CategoricalColumn):
+                rows_by_code = defaultdict(list)
+                for row, code in enumerate(column.codes[:size]):
+                    rows_by_code[code].append(row)
+                for code, rows in rows_by_code.items():
+                    for value in values_of({field: column.categories[code]}):
+                        rows_by_value[value].extend(rows)
+            else:
+                for row in range(size):
+                    rows_by_value[column[row]].append(row)
+            index.postings[field] = {value: to_bitset(rows, size) for value, rows in rows_by_value.items()}
+        index.size = size
+        return index
+
+    def add(self, alunos):
+        rows_by_value = {field: defaultdict(list) for field in SEARCH_FIELDS}
+        end = self.size
+        for end, aluno in enumerate(alunos, start=self.size + 1):
+            for field, values_of in SEARCH_FIELDS.items():
+                for value in values_of(aluno):
+                    rows_by_value[field][value].append(end - 1)
+
+        for field, rows_of in rows_by_value.items():
+            postings = self.postings[field]
+            for value, rows in rows_of.items():
+                postings[value] = postings.get(value, 0) | to_bitset(rows, end)
+        self.size = end
+
+    def match(self, filters, ranges=None, size=None):
+        result = (1 << (self.size if size is None else size)) - 1
+        for field, values in filters.items():
+            if not values:
+                continue
+            postings = self.postings[field]
+            union = 0
+            for value in values:
+                union |= postings.get(value, 0)
+            result &= union
+
+        for field, (low, high) in (ranges or {}).items():
+            if low is None and high is None:
+                continue
+            union = 0
+            for value, bits in list(self.postings[field].items()):
+                if (low is None or value >= low) and (high is None or value <= high):
+                    union |= bits
+            result &= union
+        return result
+
+    def counts(self, bits, fields):
+        result = {}
+        for field in fields:
+            counts = []
+            for value, posting in list(self.postings[field].items()):
+                count = (posting & bits).bit_count()
+                if count:
+                    counts.append((value, count))
+            counts.sort(key=lambda item: (-item[1], item[0]))
+            result[field] = [{'value': value, 'count': count} for value, count in counts]
+        return result
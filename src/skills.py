@@ -0,0 +1,120 @@
+import sys
+
+from text import fold
+
+
+# Canonical skill -> other spellings of it. Case, accents and spacing are folded
+# before the lookup, so only spellings that differ beyond that need listing.
+SKILL_SYNONYMS = {
+    'Adobe Creative Suite': ('Adobe CC', 'Adobe Creative Cloud', 'Pacote Adobe'),
+    'Adobe Illustrator': ('Illustrator', 'Ilustrator'),
+    'Adobe InDesign': ('InDesign',),
+    'Adobe Photoshop': ('Photoshop',),
+    'Assembly': ('Assembler',),
+    'Business Analytics': (),
+    'C': ('Linguagem C',),
+    'C#': ('CSharp',),
+    'C++': ('CPP',),
+    'Certificações': ('Certificados',),
+    'CSS': ('CSS3',),
+    'Data Science': ('Ciência de Dados',),
+    'Design de Produto': ('Product Design',),
+    'Engenharia de Dados': ('Data Engineering',),
+    'Excel': ('MS Excel', 'Microsoft Excel', 'Excel Avançado'),
+    'Figma': (),
+    'Gestão de Negócios': ('Business Management',),
+    'Gestão de Operações': ('Operations Management',),
+    'Gestão de Projetos': ('Gerenciamento de Projetos', 'Project Management'),
+    'HTML': ('HTML5',),
+    'Inteligência Artificial': ('IA', 'AI', 'Artificial Intelligence'),
+    'Java': (),
+    'JavaScript': ('JS',),
+    'Logística': ('Logistics',),
+    'Machine Learning': ('ML', 'Aprendizado de Máquina'),
+    'MATLAB': (),
+    'Modelagem Financeira': ('Financial Modeling', 'Financial Modelling'),
+    'Power BI': ('PowerBI',),
+    'PowerPoint': ('Power Point', 'PPT', 'MS PowerPoint'),
+    'Problem Solving': ('Resolução de Problemas',),
+    'Programação Embarcada': ('Sistemas Embarcados', 'Embedded'),
+    'Python': ('Python3', 'Python 3'),
+    'R': ('Linguagem R',),
+    'SAP': (),
+    'SQL': (),
+    'Supply Chain': ('Cadeia de Suprimentos',),
+    'TOTVS': (),
+    'Trading': (),
+}
+
+# Terms that name several skills at once.
+SKILL_BUNDLES = {
+    'Adobe Photoshop, Ilustrator e Indesign': ('Adobe Photoshop', 'Adobe Illustrator', 'Adobe InDesign'),
+    'Ilustrator e Indesign': ('Adobe Illustrator', 'Adobe InDesign'),
+    'SAP e TOTVS': ('SAP', 'TOTVS'),
+}
+
+# Answers that name no skill at all.
+PLACEHOLDER_SKILLS = ('Outras', 'Outra', 'Outros', 'Nenhuma', 'Nenhum', 'N/A', 'NA', '-')
+
+
+def skill_key(term):
+    return ' '.join(fold(term).split()).strip(' .')
+
+
+class SkillTable:
+    """Folded spelling -> canonical skills, compiled once from the tables above.
+
+    Canonical names are interned, so every student's list shares the same
+    string objects and index lookups on them are pointer comparisons.
+
+    Terms the table does not know are folded the same way and kept with the
+    first spelling seen, so 'Rust' and 'RUST' end up as one skill.
+    """
+
+    def __init__(self, synonyms=SKILL_SYNONYMS, bundles=SKILL_BUNDLES, placeholders=PLACEHOLDER_SKILLS):
+        self.lookup = {}
+        for skill, spellings in synonyms.items():
+            skill = sys.intern(skill)
+            for spelling in (skill, *spellings):
+                self.lookup[skill_key(spelling)] = (skill,)
+        for spelling, skills in bundles.items():
+            self.lookup[skill_key(spelling)] = tuple(sys.intern(skill) for skill in skills)
+        for spelling in placeholders:
+            self.lookup[skill_key(spelling)] = ()
+        # Folded spelling -> first spelling seen, for terms missing from the lookup.
+        self.unmapped = {}
+
+    def register(self, skills):
+        """Adopt the spellings of already stored skills, e.g. from a snapshot."""
+        for skill in skills:
+            key = skill_key(skill)
+            if key not in self.lookup:
+                self.unmapped.setdefault(key, sys.intern(skill))
+
+    def canonicalize(self, terms):
+        """The canonical skills for `terms`, without repeats, and the terms the table does not know."""
+        skills = {}
+        unmapped = []
+        for term in terms:
+            term = ' '.join(str(term).split())
+            if not term:
+                continue
+            key = skill_key(term)
+            canonical = self.lookup.get(key)
+            if canonical is None:
+                term = self.unmapped.setdefault(key, sys.intern(term))
+                unmapped.append(term)
+                canonical = (term,)
+            skills.update(dict.fromkeys(canonical))
+        return list(skills), unmapped
+
+    def search_terms(self, terms):
+        # Placeholders keep their own spelling here, so filtering on one matches nobody instead of everybody.
+        skills = []
+        for term in terms:
+            key = skill_key(term)
+            skills.extend(self.lookup.get(key) or (self.unmapped.get(key, term),))
+        return skills
+
+
+SKILL_TABLE = SkillTable()
@@ -0,0 +1,131 @@
+"""Compact binary snapshot of the student store.
+
+Layout: an 8-byte magic, the length of a JSON header (little-endian uint64),
+the header, then every column buffer aligned to 8 bytes. The header holds
+each column's metadata (categories, sizes) and where its buffers live, plus
+the facet counts, so opening a snapshot never touches the rows themselves.
+With mmap the buffers are views over the file and pages are read on demand.
+
+The trigram index behind `q=` is stored the same way: rebuilding it from the
+columns takes seconds at 100k students, too long for a Lambda request.
+Snapshots written without it still load, and build it on first use.
+
+Build one with:
+
+    python src/snapshot.py alunos.snapshot                 # from fake_alunos.py
+    python src/snapshot.py alunos.snapshot --xlsx sheet.xlsx
+"""
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from facets import FacetIndex
+from store import COLUMNS, StudentStore
+from text import TextIndex
+
+
+MAGIC = b'ALUNOS1\0'
+ALIGNMENT = 8
+
+
+def write_snapshot(dataset, path):
+    store = dataset.store
+    header = {
+        'size': len(store),
+        'itemsizes': {typecode: array(typecode).itemsize for typecode in 'BIQi'},
+        'columns': {},
+        'facets': {name: dict(counts) for name, counts in dataset.facets.counts.items()},
+    }
+    chunks = []
+    offset = 0
+
+    def spec(owner):
+        nonlocal offset
+        buffers = {}
+        for buffer_name, buffer in owner.buffers().items():
+            data = memoryview(buffer).cast('B')
+            buffers[buffer_name] = [owner.BUFFERS[buffer_name], offset, len(data)]
+            padding = -len(data) % ALIGNMENT
+            chunks.append(bytes(data) + b'\0' * padding)
+            offset += len(data) + padding
+        return {'meta': owner.meta(), 'buffers': buffers}
+
+    for name, column in store.columns.items():
+        header['columns'][name] = spec(column)
+    header['text'] = spec(dataset.text)
+
+    encoded = json.dumps(header, ensure_ascii=False).encode()
+    encoded += b' ' * (-(len(MAGIC) + 8 + len(encoded)) % ALIGNMENT)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(MAGIC)
+        f.write(struct.pack('<Q', len(encoded)))
+        f.write(encoded)
+        for chunk in chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path, use_mmap=True):
+    with open(path, 'rb') as f:
+        if use_mmap:
+            data = memoryview(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+        else:
+            data = memoryview(f.read())
+
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{path} não é um snapshot de alunos")
+    (header_size,) = struct.unpack('<Q', data[len(MAGIC):len(MAGIC) + 8])
+    body_start = len(MAGIC) + 8 + header_size
+    header = json.loads(bytes(data[len(MAGIC) + 8:body_start]))
+
+    for typecode, itemsize in header['itemsizes'].items():
+        if array(typecode).itemsize != itemsize:
+            raise ValueError(f"Snapshot gerado em uma plataforma incompatível ({typecode!r})")
+
+    def buffers(spec):
+        return {
+            buffer_name: data[body_start + offset:body_start + offset + size].cast(typecode)
+            for buffer_name, (typecode, offset, size) in spec['buffers'].items()
+        }
+
+    columns = {}
+    for name, column in COLUMNS.items():
+        spec = header['columns'][name]
+        columns[name] = column.from_buffers(spec['meta'], buffers(spec))
+
+    store = StudentStore(columns=columns, size=header['size'])
+    spec = header.get('text')
+    text = TextIndex.from_buffers(spec['meta'], buffers(spec)) if spec is not None else None
+    return store, FacetIndex.from_counts(header['facets']), text
+
+
+def main():
+    from dataset import Dataset
+
+    parser = argparse.ArgumentParser(description="Gera um snapshot binário dos alunos")
+    parser.add_argument('output')
+    parser.add_argument('--xlsx', help="planilha de origem (padrão: fake_alunos.py)")
+    args = parser.parse_args()
+
+    if args.xlsx:
+        from spreadsheet import read_alunos
+
+        with open(args.xlsx, 'rb') as f:
+            alunos, rejected = read_alunos(f)
+        print(f"{rejected} linhas rejeitadas")
+    else:
+        sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        from fake_alunos import FAKE_ALUNOS as alunos
+
+    dataset = Dataset(alunos)
+    write_snapshot(dataset, args.output)
+    print(f"{len(dataset.store)} alunos gravados em {args.output}")
+
+
+if __name__ == '__main__':
+    main()
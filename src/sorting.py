@@ -0,0 +1,99 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+from store import CategoricalColumn, IntColumn
+from text import fold
+
+
+SORT_FIELDS = ('nome', 'ano_graduacao', 'universidade', 'cidade')
+
+
+class SortIndex:
+    """Row permutations of the store ordered by each of SORT_FIELDS.
+
+    Text sorts ignoring case and accents. Rows with equal values keep row
+    order, so a cursor can name the last row served: it is found again with a
+    binary search, wherever new rows landed since.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        # Per-row sort keys; categorical values share one folded key per category.
+        self.keys = {field: [] for field in SORT_FIELDS}
+        self.orders = {field: array('I') for field in SORT_FIELDS}
+        self._folded = {field: {} for field in SORT_FIELDS}
+        self.size = 0
+        self.add()
+
+    def _sort_keys(self, field, rows):
+        column = self.store.columns[field]
+        if isinstance(column, CategoricalColumn):
+            folded = self._folded[field]
+            for category in column.categories[len(folded):]:
+                folded[category] = fold(category)
+            return [folded[column[row]] for row in rows]
+        if isinstance(column, IntColumn):
+            return [column[row] for row in rows]
+        return [fold(column[row]) for row in rows]
+
+    def add(self):
+        """Merges the store rows added since the last call into every order."""
+        start, end = self.size, len(self.store)
+        if start == end:
+            return
+
+        for field in SORT_FIELDS:
+            keys = self.keys[field]
+            keys.extend(self._sort_keys(field, range(start, end)))
+            key_of = keys.__getitem__
+
+            # Sorts are stable and new rows come after every indexed row, so
+            # sorting by the key alone keeps equal keys in row order.
+            order = self.orders[field]
+            new = sorted(range(start, end), key=key_of)
+            if len(new) * 64 < len(order):
+                # A few rows: find their places by binary search and copy the runs between them.
+                merged = array('I')
+                previous = 0
+                for row in new:
+                    position = bisect_right(order, keys[row], lo=previous, key=key_of)
+                    merged += order[previous:position]
+                    merged.append(row)
+                    previous = position
+                merged += order[previous:]
+            else:
+                # Two sorted runs, which timsort merges in linear time.
+                merged = array('I', sorted(order.tolist() + new, key=key_of))
+            # Readers hold on to whichever array they picked up; it is never mutated.
+            self.orders[field] = merged
+        self.size = end
+
+    @staticmethod
+    def _position(order, keys, row):
+        # Rows sharing a key sit in row order, so a second search within that run finds the row.
+        key_of = keys.__getitem__
+        low = bisect_left(order, keys[row], key=key_of)
+        high = bisect_right(order, keys[row], lo=low, key=key_of)
+        return bisect_left(order, row, low, high)
+
+    def page(self, field, descending, after, limit, size):
+        """Up to `limit` rows below `size` that follow row `after` (None: from the start), and whether more follow."""
+        keys = self.keys[field]
+        order = self.orders[field]
+        if descending:
+            end = len(order) if after is None else self._position(order, keys, after)
+            positions = range(end - 1, -1, -1)
+        else:
+            start = 0 if after is None else self._position(order, keys, after) + 1
+            positions = range(start, len(order))
+
+        rows = []
+        for position in positions:
+            row = order[position]
+            # Rows past the reader's snapshot may already be merged in.
+            if row >= size:
+                continue
+            if len(rows) == limit:
+                return rows, True
+            rows.append(row)
+        return rows, False
@@ -0,0 +1,186 @@
+import calendar
+import datetime
+import io
+import re
+
+
+REQUIRED_COLUMNS = [
+    'Nome',
+    'Email de contato',
+    'Universidade',
+    'Curso',
+    'Ano de graduação',
+    'Telefone',
+    'Cidade',
+    'Estado',
+    'País',
+    'CPF (só números)',
+    'Modalidades de estágio buscadas',
+    'Competências',
+    'Já estagiou?/ Está estagiando?',
+    'Você autoriza o compartilhamento dos seus dados para os bancos de talentos das empresas presentes no WI34?',
+]
+
+ALL_COLUMNS = REQUIRED_COLUMNS + [
+    'Email institucional',
+    'Aberto a propostas de trabalho',
+    'Áreas de interesse',
+    'Organizações estudantis',
+    'LinkedIn',
+    'Currículo',
+    'Etnia',
+    'Gênero',
+    'PCD',
+    'LGBTQIA+',
+    'Data de nascimento (DD/MM/AA)',
+    'Ano de ingresso na universidade',
+    'Previsão Formatura',
+    'Nível de Espanhol',
+    'Nível de Inglês',
+    'Nível de Excel',
+    'Setores de Interesse',
+    'Qual é a primeira empresa que vem a sua mente quando pensa em estagiar?',
+    'Caso tenha outras competências, indique quais',
+    'Se sim, em qual setor(es)?',
+]
+
+
+# Sheet header -> Aluno field, for the columns the served dataset keeps.
+SPREADSHEET_FIELDS = {
+    'Nome': 'nome',
+    'Email de contato': 'email',
+    'Universidade': 'universidade',
+    'Curso': 'curso',
+    'Ano de graduação': 'ano_graduacao',
+    'Telefone': 'telefone',
+    'Cidade': 'cidade',
+    'Estado': 'estado',
+    'País': 'pais',
+    'CPF (só números)': 'cpf',
+    'Modalidades de estágio buscadas': 'modalidade_estagio',
+    'Competências': 'competencias',
+    'Já estagiou?/ Está estagiando?': 'ja_estagiou',
+    'Você autoriza o compartilhamento dos seus dados para os bancos de talentos das empresas presentes no WI34?': 'autoriza_dados',
+}
+
+# Free-text skills, merged into 'Competências' at ingest.
+OTHER_SKILLS_COLUMN = 'Caso tenha outras competências, indique quais'
+
+TRUE_ANSWERS = {'sim', 's', 'yes', 'true', '1'}
+FALSE_ANSWERS = {'não', 'nao', 'n', 'no', 'false', '0'}
+
+
+class MissingColumnsError(ValueError):
+    """The sheet lacks required columns.
+
+    Parsing may run in a process worker, so this must stay a plain, picklable
+    exception; main.py turns it into the HTTP error.
+    """
+
+
+def check_required_columns(columns):
+    cols = []
+    for col in REQUIRED_COLUMNS:
+        if col not in columns:
+            cols.append(col)
+
+    if len(cols) > 0:
+        raise MissingColumnsError(f"Colunas {cols} não encontrada")
+
+
+def _as_file(spreadsheet):
+    # Uploads arrive as the spooled upload file, or as bytes for process workers.
+    if isinstance(spreadsheet, (bytes, bytearray)):
+        return io.BytesIO(spreadsheet)
+    return spreadsheet
+
+
+# pandas and openpyxl (which pulls in NumPy) are imported on first use: they take
+# most of a cold start and only the upload endpoint needs them.
+def spreadsheet_to_json(spreadsheet):
+    import pandas as pd
+
+    df = pd.read_excel(_as_file(spreadsheet), usecols=ALL_COLUMNS)
+    check_required_columns(df.columns)
+
+    return df.to_json(orient='records')
+
+
+def _json_value(value):
+    # Same encoding df.to_json(orient='records') uses: dates become epoch milliseconds.
+    if isinstance(value, datetime.datetime):
+        return calendar.timegm(value.timetuple()) * 1000 + value.microsecond // 1000
+    if isinstance(value, datetime.date):
+        return calendar.timegm(value.timetuple()) * 1000
+    if isinstance(value, datetime.time):
+        return value.isoformat()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+
+def iter_spreadsheet_records(fileobj):
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, ())
+        check_required_columns(header)
+
+        positions = [(col, header.index(col) if col in header else None) for col in ALL_COLUMNS]
+        for row in rows:
+            if all(value is None for value in row):
+                continue
+            yield {
+                col: _json_value(row[i]) if i is not None and i < len(row) else None
+                for col, i in positions
+            }
+    finally:
+        workbook.close()
+
+
+def _to_bool(value):
+    if isinstance(value, bool):
+        return value
+    answer = str(value).strip().lower()
+    if answer in TRUE_ANSWERS or answer.startswith('sim'):
+        return True
+    if answer in FALSE_ANSWERS or answer.startswith(('não', 'nao')):
+        return False
+    raise ValueError(f"Resposta inválida: {value!r}")
+
+
+def _to_cpf(value):
+    if isinstance(value, (int, float)):
+        return f'{int(value):011d}'
+    return re.sub(r'\D', '', str(value))
+
+
+def record_to_aluno(record):
+    aluno = {field: record[col] for col, field in SPREADSHEET_FIELDS.items()}
+    if any(value is None or value == '' for value in aluno.values()):
+        raise ValueError("Campos obrigatórios vazios")
+
+    for field in ('nome', 'email', 'universidade', 'curso', 'telefone', 'cidade', 'estado', 'pais', 'modalidade_estagio'):
+        aluno[field] = str(aluno[field]).strip()
+    aluno['ano_graduacao'] = int(aluno['ano_graduacao'])
+    aluno['cpf'] = _to_cpf(aluno['cpf'])
+    skills = str(aluno['competencias'])
+    if record.get(OTHER_SKILLS_COLUMN) not in (None, ''):
+        skills += ',' + str(record[OTHER_SKILLS_COLUMN])
+    aluno['competencias'] = [skill.strip() for skill in re.split(r'[,;\n]', skills) if skill.strip()]
+    aluno['ja_estagiou'] = _to_bool(aluno['ja_estagiou'])
+    aluno['autoriza_dados'] = _to_bool(aluno['autoriza_dados'])
+    return aluno
+
+
+def read_alunos(spreadsheet):
+    alunos = []
+    rejected = 0
+    for record in iter_spreadsheet_records(_as_file(spreadsheet)):
+        try:
+            alunos.append(record_to_aluno(record))
+        except ValueError:
+            rejected += 1
+    return alunos, rejected
@@ -0,0 +1,246 @@
+from array import array
+
+
+class Column:
+    """Base for the store columns.
+
+    BUFFERS names the attributes holding the column's raw data and their array
+    typecodes. A column loaded from a snapshot holds read-only memoryviews over
+    the file; they are copied into growable arrays on the first append.
+
+    checkpoint() and rollback() let StudentStore.extend undo a partial append.
+    """
+
+    BUFFERS = {}
+
+    @classmethod
+    def from_buffers(cls, meta, buffers):
+        column = cls.__new__(cls)
+        for name, buffer in buffers.items():
+            setattr(column, name, buffer)
+        column.load_meta(meta)
+        return column
+
+    def buffers(self):
+        return {name: getattr(self, name) for name in self.BUFFERS}
+
+    def meta(self):
+        return {}
+
+    def load_meta(self, meta):
+        pass
+
+    def writable(self):
+        for name, typecode in self.BUFFERS.items():
+            buffer = getattr(self, name)
+            if isinstance(buffer, memoryview):
+                setattr(self, name, bytearray(buffer) if typecode == 'B' else array(typecode, buffer))
+
+    def checkpoint(self):
+        return {name: len(getattr(self, name)) for name in self.BUFFERS}
+
+    def rollback(self, checkpoint):
+        for name in self.BUFFERS:
+            del getattr(self, name)[checkpoint[name]:]
+
+
+class CategoricalColumn(Column):
+
+    BUFFERS = {'codes': 'I'}
+
+    def __init__(self):
+        self.codes = array('I')
+        self.categories = []
+        self.lookup = {}
+
+    def meta(self):
+        return {'categories': self.categories}
+
+    def load_meta(self, meta):
+        self.categories = meta['categories']
+        self.lookup = {value: code for code, value in enumerate(self.categories)}
+
+    def checkpoint(self):
+        return {**super().checkpoint(), 'categories': len(self.categories)}
+
+    def rollback(self, checkpoint):
+        super().rollback(checkpoint)
+        for value in self.categories[checkpoint['categories']:]:
+            del self.lookup[value]
+        del self.categories[checkpoint['categories']:]
+
+    def encode(self, value):
+        code = self.lookup.get(value)
+        if code is None:
+            code = len(self.categories)
+            self.categories.append(value)
+            self.lookup[value] = code
+        return code
+
+    def append(self, value):
+        self.codes.append(self.encode(value))
+
+    def __getitem__(self, row):
+        return self.categories[self.codes[row]]
+
+
+class StringColumn(Column):
+
+    BUFFERS = {'data': 'B', 'offsets': 'Q'}
+
+    def __init__(self):
+        self.data = bytearray()
+        self.offsets = array('Q', [0])
+
+    def append(self, value):
+        self.data += value.encode()
+        self.offsets.append(len(self.data))
+
+    def __getitem__(self, row):
+        return str(self.data[self.offsets[row]:self.offsets[row + 1]], 'utf-8')
+
+
+class IntColumn(Column):
+
+    BUFFERS = {'values': 'i'}
+
+    def __init__(self):
+        self.values = array('i')
+
+    def append(self, value):
+        self.values.append(value)
+
+    def __getitem__(self, row):
+        return self.values[row]
+
+
+class BoolColumn(Column):
+
+    BUFFERS = {'bitmap': 'B'}
+
+    def __init__(self):
+        self.bitmap = bytearray()
+        self.size = 0
+
+    def meta(self):
+        return {'size': self.size}
+
+    def load_meta(self, meta):
+        self.size = meta['size']
+
+    def checkpoint(self):
+        # The last byte may be partially filled by the rows being rolled back.
+        return {**super().checkpoint(), 'size': self.size, 'last': self.bitmap[-1] if self.bitmap else 0}
+
+    def rollback(self, checkpoint):
+        super().rollback(checkpoint)
+        if self.bitmap:
+            self.bitmap[-1] = checkpoint['last']
+        self.size = checkpoint['size']
+
+    def append(self, value):
+        if self.size % 8 == 0:
+            self.bitmap.append(0)
+        if value:
+            self.bitmap[-1] |= 1 << (self.size % 8)
+        self.size += 1
+
+    def __getitem__(self, row):
+        return bool(self.bitmap[row >> 3] >> (row & 7) & 1)
+
+
+class ListColumn(CategoricalColumn):
+    """CSR layout: row i owns codes[offsets[i]:offsets[i + 1]]."""
+
+    BUFFERS = {'codes': 'I', 'offsets': 'Q'}
+
+    def __init__(self):
+        super().__init__()
+        self.offsets = array('Q', [0])
+
+    def append(self, values):
+        for value in values:
+            self.codes.append(self.encode(value))
+        self.offsets.append(len(self.codes))
+
+    def __getitem__(self, row):
+        categories = self.categories
+        return [categories[code] for code in self.codes[self.offsets[row]:self.offsets[row + 1]]]
+
+
+# Field order matches the Aluno response model.
+COLUMNS = {
+    'nome': StringColumn,
+    'email': StringColumn,
+    'universidade': CategoricalColumn,
+    'curso': CategoricalColumn,
+    'ano_graduacao': IntColumn,
+    'telefone': StringColumn,
+    'cidade': CategoricalColumn,
+    'estado': CategoricalColumn,
+    'pais': CategoricalColumn,
+    'cpf': StringColumn,
+    'modalidade_estagio': CategoricalColumn,
+    'competencias': ListColumn,
+    'ja_estagiou': BoolColumn,
+    'autoriza_dados': BoolColumn,
+}
+
+ALUNO_FIELDS = ('id',) + tuple(COLUMNS)
+
+
+class StudentStore:
+
+    def __init__(self, alunos=(), columns=None, size=0):
+        self.columns = columns or {name: column() for name, column in COLUMNS.items()}
+        self.size = size
+        self._projections = {}
+        self.extend(alunos)
+
+    def extend(self, alunos):
+        alunos = list(alunos)
+        if not alunos:
+            return
+        for column in self.columns.values():
+            column.writable()
+
+        # All or nothing: a failed append must not leave columns of different lengths.
+        checkpoints = {name: column.checkpoint() for name, column in self.columns.items()}
+        size = self.size
+        try:
+            for aluno in alunos:
+                for name, column in self.columns.items():
+                    column.append(aluno[name])
+                size += 1
+        except BaseException:
+            for name, column in self.columns.items():
+                column.rollback(checkpoints[name])
+            raise
+        # Rows past self.size are invisible to readers until this assignment.
+        self.size = size
+
+    def __len__(self):
+        return self.size
+
+    def projection(self, fields=ALUNO_FIELDS):
+        # Compiled once per distinct field tuple; only the requested columns are decoded.
+        project = self._projections.get(fields)
+        if project is None:
+            with_id = 'id' in fields
+            getters = [(name, self.columns[name].__getitem__) for name in fields if name != 'id']
+
+            def project(row):
+                aluno = {'id': row} if with_id else {}
+                for name, get in getters:
+                    aluno[name] = get(row)
+                return aluno
+
+            self._projections[fields] = project
+        return project
+
+    def row(self, row, fields=ALUNO_FIELDS):
+        return self.projection(fields)(row)
+
+    def rows(self, rows, fields=ALUNO_FIELDS):
+        project = self.projection(fields)
+        return [project(row) for row in rows]
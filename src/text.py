@@ -0,0 +1,259 @@
+import heapq
+import os
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from itertools import groupby
+
+from search import iter_bits, to_bitset
+
+
+TEXT_FIELDS = ('nome', 'email', 'cidade', 'universidade')
+# Words sharing a smaller fraction of their trigrams with a query word do not match it (pg_trgm's default).
+TEXT_SIMILARITY = float(os.environ.get('TEXT_SIMILARITY', '0.3'))
+
+
+def fold(text):
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def words(text):
+    return re.findall(r'[^\W\d_]+|\d+', fold(text))
+
+
+def trigrams(word):
+    padded = f'  {word} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class TextIndex:
+    """Trigram index over the accent-folded, casefolded words of TEXT_FIELDS.
+
+    Query words are matched against the vocabulary, not against the rows:
+    `grams` maps a trigram to the ids of the words containing it, and each word
+    keeps the rows it appears in. Words found in many rows also keep them as a
+    bitset, which is never larger than the row array it mirrors.
+
+    An index loaded from a snapshot (see from_buffers) holds read-only
+    memoryviews over the file; the lists and arrays a new word or row touches
+    are copied out when it is added.
+    """
+
+    # Snapshot buffers and their array typecodes. Row ids and the ids of the
+    # words in each gram are stored CSR-style, one run per word or gram.
+    BUFFERS = {
+        'gram_counts': 'I',
+        'rows': 'I',
+        'row_offsets': 'Q',
+        'gram_words': 'I',
+        'gram_offsets': 'Q',
+        'bits': 'B',
+    }
+
+    def __init__(self, alunos=()):
+        self.vocabulary = []
+        self.ids = {}
+        self.gram_counts = []
+        self.grams = defaultdict(list)
+        self.rows = []
+        self.bits = []
+        self.size = 0
+        self.add(alunos)
+
+    @classmethod
+    def from_store(cls, store, chunk_size=10_000):
+        # In chunks, so only `chunk_size` decoded rows are alive at a time.
+        index = cls()
+        for start in range(0, len(store), chunk_size):
+            index.add(store.rows(range(start, min(start + chunk_size, len(store))), TEXT_FIELDS))
+        return index
+
+    def meta(self):
+        return {
+            'size': self.size,
+            'vocabulary': self.vocabulary,
+            'grams': list(self.grams),
+            'dense': [word_id for word_id, bits in enumerate(self.bits) if bits is not None],
+        }
+
+    def buffers(self):
+        rows = array('I')
+        row_offsets = array('Q', [0])
+        for word_rows in self.rows:
+            rows.extend(word_rows)
+            row_offsets.append(len(rows))
+        gram_words = array('I')
+        gram_offsets = array('Q', [0])
+        for word_ids in self.grams.values():
+            gram_words.extend(word_ids)
+            gram_offsets.append(len(gram_words))
+        # Dense words' bitsets, each padded to the same number of bytes.
+        width = (self.size + 7) // 8
+        bits = bytearray()
+        for word_bits in self.bits:
+            if word_bits is not None:
+                bits += word_bits.to_bytes(width, 'little')
+        return {
+            'gram_counts': array('I', self.gram_counts),
+            'rows': rows,
+            'row_offsets': row_offsets,
+            'gram_words': gram_words,
+            'gram_offsets': gram_offsets,
+            'bits': bits,
+        }
+
+    @classmethod
+    def from_buffers(cls, meta, buffers):
+        index = cls()
+        index.size = meta['size']
+        index.vocabulary = meta['vocabulary']
+        index.ids = {word: word_id for word_id, word in enumerate(index.vocabulary)}
+        index.gram_counts = buffers['gram_counts']
+        rows, offsets = buffers['rows'], buffers['row_offsets']
+        index.rows = [rows[offsets[i]:offsets[i + 1]] for i in range(len(index.vocabulary))]
+        words, offsets = buffers['gram_words'], buffers['gram_offsets']
+        index.grams = defaultdict(list, {
+            gram: words[offsets[i]:offsets[i + 1]] for i, gram in enumerate(meta['grams'])
+        })
+        index.bits = [None] * len(index.vocabulary)
+        width = (index.size + 7) // 8
+        bits = buffers['bits']
+        for i, word_id in enumerate(meta['dense']):
+            index.bits[word_id] = int.from_bytes(bits[i * width:(i + 1) * width], 'little')
+        return index
+
+    def _word_id(self, word):
+        word_id = self.ids.get(word)
+        if word_id is None:
+            # Everything a reader may look up by id is in place before the id is
+            # reachable through `grams`.
+            word_id = len(self.vocabulary)
+            grams = trigrams(word)
+            if isinstance(self.gram_counts, memoryview):
+                self.gram_counts = array('I', self.gram_counts)
+            self.vocabulary.append(word)
+            self.gram_counts.append(len(grams))
+            self.rows.append(array('I'))
+            self.bits.append(None)
+            for gram in grams:
+                word_ids = self.grams[gram]
+                if isinstance(word_ids, memoryview):
+                    # Readers keep whichever sequence they picked up.
+                    word_ids = self.grams[gram] = list(word_ids)
+                word_ids.append(word_id)
+            self.ids[word] = word_id
+        return word_id
+
+    def add(self, alunos):
+        found = {}
+        rows_by_word = defaultdict(list)
+        end = self.size
+        for end, aluno in enumerate(alunos, start=self.size + 1):
+            row_words = set()
+            for field in TEXT_FIELDS:
+                text = aluno[field]
+                if text not in found:
+                    found[text] = words(text)
+                row_words.update(found[text])
+            for word in row_words:
+                rows_by_word[self._word_id(word)].append(end - 1)
+
+        for word_id, rows in rows_by_word.items():
+            if isinstance(self.rows[word_id], memoryview):
+                self.rows[word_id] = array('I', self.rows[word_id])
+            self.rows[word_id].extend(rows)
+            if self.bits[word_id] is not None:
+                self.bits[word_id] |= to_bitset(rows, end)
+            elif len(self.rows[word_id]) * 32 >= end:
+                self.bits[word_id] = to_bitset(self.rows[word_id], end)
+        self.size = end
+
+    def similar(self, word):
+        """(similarity, word id) of the vocabulary words matching `word`, best first."""
+        grams = trigrams(word)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self.grams.get(gram, ()))
+
+        # Similarity is at most common / len(grams), which rules out most candidates
+        # before the exact value is worked out.
+        least = TEXT_SIMILARITY * len(grams)
+        gram_counts = self.gram_counts
+        matches = [
+            (common / (len(grams) + gram_counts[word_id] - common), word_id)
+            for word_id, common in shared.items()
+            if common >= least
+        ]
+        matches = [match for match in matches if match[0] >= TEXT_SIMILARITY]
+        matches.sort(reverse=True)
+        return matches
+
+    def _bitset(self, word_ids, size):
+        bits = 0
+        sparse = []
+        for word_id in word_ids:
+            if self.bits[word_id] is not None:
+                bits |= self.bits[word_id]
+            else:
+                rows = self.rows[word_id]
+                sparse.extend(rows[:bisect_left(rows, size)])
+        return bits | to_bitset(sparse, size) if sparse else bits
+
+    def search(self, query, mask, size):
+        """Rows of `mask` in which every word of `query` matches, best match first, and their count.
+
+        A row's score is the sum, over the query words, of the similarity of the
+        best word it contains. Rows with the same score keep row order.
+        """
+        tiers = []
+        result = mask
+        for word in set(words(query)):
+            # One tier per similarity value, holding the rows whose best match is at that value.
+            word_tiers = []
+            seen = 0
+            for similarity, matches in groupby(self.similar(word), key=lambda match: match[0]):
+                bits = self._bitset([word_id for _, word_id in matches], size) & ~seen
+                if bits:
+                    word_tiers.append((similarity, bits))
+                    seen |= bits
+            result &= seen
+            if not result:
+                return iter(()), 0
+            tiers.append(word_tiers)
+
+        # Restricted to the final result; tiers left empty would only add dead combinations.
+        restricted = []
+        for word_tiers in tiers:
+            restricted.append([])
+            for similarity, bits in word_tiers:
+                bits &= result
+                if bits:
+                    restricted[-1].append((similarity, bits))
+        return self._ranked(restricted, result), result.bit_count()
+
+    @staticmethod
+    def _ranked(tiers, result):
+        # Every row sits in exactly one tier per query word, so visiting the tier
+        # combinations by descending total similarity yields the rows best first.
+        def score(combination):
+            return sum(tiers[word][tier][0] for word, tier in enumerate(combination))
+
+        start = (0,) * len(tiers)
+        heap = [(-score(start), start)]
+        queued = {start}
+        while heap:
+            _, combination = heapq.heappop(heap)
+            bits = result
+            for word, tier in enumerate(combination):
+                bits &= tiers[word][tier][1]
+            yield from iter_bits(bits)
+
+            for word, tier in enumerate(combination):
+                if tier + 1 < len(tiers[word]):
+                    following = combination[:word] + (tier + 1,) + combination[word + 1:]
+                    if following not in queued:
+                        queued.add(following)
+                        heapq.heappush(heap, (-score(following), following))
@@ -0,0 +1,68 @@
+import os
+
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.formparsers import MultiPartParser
+from starlette.responses import JSONResponse
+
+
+UPLOAD_MAX_BYTES = int(os.environ.get('UPLOAD_MAX_BYTES', str(10 * 1024 * 1024)))
+UPLOAD_SPOOL_BYTES = int(os.environ.get('UPLOAD_SPOOL_BYTES', str(1024 * 1024)))
+
+# Uploaded files are read in chunks into a SpooledTemporaryFile, which moves to
+# disk once it holds more than this many bytes.
+MultiPartParser.spool_max_size = UPLOAD_SPOOL_BYTES
+
+
+def too_large_detail(max_bytes):
+    return f"Requisição maior que o limite de {max_bytes} bytes"
+
+
+class BodySizeLimitMiddleware:
+    """Rejects request bodies over `max_body_size` with 413.
+
+    A declared Content-Length is checked up front; otherwise the bytes are
+    counted as they stream in, and reading stops as soon as the limit is
+    crossed, before the rest of the body is buffered anywhere.
+    """
+
+    def __init__(self, app, max_body_size=UPLOAD_MAX_BYTES):
+        self.app = app
+        self.max_body_size = max_body_size
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get('content-length')
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_size:
+            response = JSONResponse({'detail': too_large_detail(self.max_body_size)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def receive_limited():
+            nonlocal received
+            message = await receive()
+            if message['type'] == 'http.request':
+                received += len(message.get('body', b''))
+                if received > self.max_body_size:
+                    # Raised inside the route's body parsing, so FastAPI turns it into the response.
+                    raise HTTPException(status_code=413, detail=too_large_detail(self.max_body_size))
+            return message
+
+        await self.app(scope, receive_limited, send)
+
+
+async def parser_source(file, pool):
+    """What to hand the spreadsheet parser for an upload.
+
+    Thread workers read the spooled upload file directly; process workers
+    cannot receive a file object, so they get the bytes.
+    """
+    if pool.kind == 'process':
+        return await file.read()
+    await file.seek(0)
+    return file.file
@@ -0,0 +1,80 @@
+import asyncio
+import os
+import threading
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from fastapi import HTTPException
+
+
+PARSER_EXECUTOR = os.environ.get('PARSER_EXECUTOR', 'thread')
+PARSER_WORKERS = int(os.environ.get('PARSER_WORKERS', '2'))
+PARSER_QUEUE_SIZE = int(os.environ.get('PARSER_QUEUE_SIZE', '4'))
+
+
+class ParserPool:
+    """Runs CPU-bound parsing off the event loop.
+
+    At most `workers` jobs run at once and `queue_size` more may wait; any
+    request beyond that is rejected with 503 instead of piling up in memory.
+
+    A process pool whose worker dies is broken for good, so it is dropped and
+    the next job starts a fresh one.
+    """
+
+    def __init__(self, kind='thread', workers=2, queue_size=4):
+        if kind not in ('thread', 'process'):
+            raise ValueError(f"PARSER_EXECUTOR deve ser 'thread' ou 'process', não {kind!r}")
+        self.kind = kind
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                if self.kind == 'process':
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers, thread_name_prefix='parser'
+                    )
+            return self._executor
+
+    def _discard(self, executor):
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+        executor.shutdown(wait=False)
+
+    def _done(self, executor, future):
+        self._slots.release()
+        if not future.cancelled() and isinstance(future.exception(), BrokenExecutor):
+            self._discard(executor)
+
+    def submit(self, fn, *args):
+        if not self._slots.acquire(blocking=False):
+            raise HTTPException(status_code=503, detail="Muitas planilhas em processamento, tente novamente")
+        try:
+            executor = self.executor
+            try:
+                future = executor.submit(fn, *args)
+            except BrokenExecutor:
+                self._discard(executor)
+                executor = self.executor
+                future = executor.submit(fn, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda future: self._done(executor, future))
+        return future
+
+    async def run(self, fn, *args):
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+
+PARSER_POOL = ParserPool(PARSER_EXECUTOR, PARSER_WORKERS, PARSER_QUEUE_SIZE)
+
+# Upload jobs report progress through the job store, so they always run on threads.
+JOB_POOL = ParserPool('thread', PARSER_WORKERS, PARSER_QUEUE_SIZE)